@@ -0,0 +1,188 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+"""
+Benchmark for the per-file ingestion path, MetaVisitRunnerMeta.execute, run offline with the tile1 header
+fixtures, mocked clients, and the mocked SVO filter service from the tests.
+
+Each of N synthetic TILEs re-uses the tile1 headers under a different TILE name, so every TILE is a new
+Observation, as in a production run. Latencies are reported by product type, and the allocations of one
+execution of each product type are measured separately, with tracemalloc.
+
+Usage:
+    python benchmarks/bench_ingest.py [--tiles 10] [--output bench_ingest.json]
+"""
+
+import argparse
+import glob
+import logging
+import os
+import platform
+import sys
+import tempfile
+from unittest.mock import Mock, patch
+
+from caom2utils.data_util import get_local_file_headers, get_local_file_info
+from caom2pipe.execute_composable import MetaVisitRunnerMeta
+from caom2pipe import manage_composable as mc
+from euclid2caom2 import file2caom2_augmentation, main_app
+from euclid2caom2.config import EUCLIDConfig
+
+from bench_util import measure_allocations, summarize, time_call, write_result
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'euclid2caom2', 'tests')
+sys.path.insert(0, TESTS_DIR)
+from test_caom_gen_visit import _svo_mock  # noqa: E402
+
+FIXTURE_DIR = os.path.join(TESTS_DIR, 'data', 'tile1')
+FIXTURE_TILE = 'TILE102070858'
+
+
+def _make_config(working_directory):
+    config = EUCLIDConfig()
+    config.collection = 'EUCLID'
+    config.scheme = 'esa'
+    config.preview_scheme = 'esa'
+    config.task_types = [mc.TaskType.SCRAPE]
+    config.use_local_files = False
+    config.logging_level = 'ERROR'
+    config.data_read_groups = ['ivo://cadc.nrc.ca/gms?EuclidCanRead', 'ivo://cadc.nrc.ca/gms?CADC']
+    config.change_working_directory(working_directory)
+    config.proxy_file_name = 'test_proxy.pem'
+    mc.StorageName.collection = config.collection
+    mc.StorageName.scheme = config.scheme
+    mc.StorageName.preview_scheme = config.preview_scheme
+    mc.StorageName.data_source_extensions = config.data_source_extensions
+    return config
+
+
+class Fixture:
+    """The headers, file information and mocked clients for one fixture file."""
+
+    def __init__(self, fqn):
+        self.file_name = os.path.basename(fqn).replace('.header', '')
+        self.product_type = main_app.EUCLIDName.parse(self.file_name).product_type
+        self.headers = get_local_file_headers(fqn)
+        self.file_info = get_local_file_info(fqn)
+        self.file_info.file_type = 'application/fits'
+
+
+def _execute(runner, clients, fixture, tile):
+    clients.data_client.get_head.return_value = fixture.headers
+    clients.data_client.info.return_value = fixture.file_info
+    storage_name = main_app.EUCLIDName([fixture.file_name.replace(FIXTURE_TILE, tile)])
+    # a failed execution stops early, so its time would be a misleading sample
+    if runner.execute({'storage_name': storage_name}) != 0:
+        raise RuntimeError(f'Execution failed for {storage_name.file_name} in {tile}.')
+
+
+def run(tiles):
+    fixtures = [Fixture(fqn) for fqn in sorted(glob.glob(f'{FIXTURE_DIR}/*.fits.header'))]
+    samples = {fixture.product_type: [] for fixture in fixtures}
+    allocations = {}
+    with tempfile.TemporaryDirectory() as working_directory, patch(
+        'caom2pipe.astro_composable.get_vo_table'
+    ) as svo_mock:
+        svo_mock.side_effect = _svo_mock
+        config = _make_config(working_directory)
+        reporter = mc.ExecutionReporter(config, mc.Observable(config))
+        clients = Mock()
+        for index in range(tiles):
+            tile = f'TILE{200000000 + index}'
+            runner = MetaVisitRunnerMeta(clients, config, [file2caom2_augmentation], reporter)
+            clients.metadata_client.read.side_effect = lambda collection, obs_id: runner._observation
+            for fixture in fixtures:
+                samples[fixture.product_type].append(time_call(_execute, runner, clients, fixture, tile))
+
+        # a TILE of its own, so the allocations are those of a populated Observation
+        runner = MetaVisitRunnerMeta(clients, config, [file2caom2_augmentation], reporter)
+        clients.metadata_client.read.side_effect = lambda collection, obs_id: runner._observation
+        for fixture in fixtures:
+            allocations[fixture.product_type] = measure_allocations(_execute, runner, clients, fixture, 'TILE1')
+
+    return {
+        product_type: {**summarize(samples[product_type]), **allocations[product_type]}
+        for product_type in samples
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tiles', type=int, default=10, help='number of synthetic TILEs')
+    parser.add_argument('--output', help='JSON results file name, default is stdout')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    result = {
+        'python': platform.python_version(),
+        'tiles': args.tiles,
+        'product_types': run(args.tiles),
+    }
+    write_result(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Micro-benchmark for Euclid file name decoding, at the scale of a full ESA listing.
+
+Usage:
+    python benchmarks/bench_storage_name.py [--count 1000000] [--output bench_storage_name.json]
+"""
+
+import argparse
+from time import perf_counter
+
+from caom2pipe.manage_composable import StorageName
+from euclid2caom2.main_app import EUCLIDName
+
+from bench_util import write_result
+
+
+PRODUCT_TYPES = [
+    f'{prefix}{band}{suffix}'
+    for band in ['VIS', 'NIR-Y', 'NIR-J', 'NIR-H']
+    for prefix, suffix in [
+        ('BGSUB-MOSAIC-', ''), ('BGMOD-', ''), ('GRID-PSF-', ''), ('MOSAIC-', '-RMS'), ('MOSAIC-', '-FLAG'),
+        ('CATALOG-PSF-', ''),
+    ]
+] + ['FINAL-CAT', 'FINAL-CUTOUTS-CAT', 'FINAL-MORPH-CAT']
+
+
+def synthetic_names(count):
+    for index in range(count):
+        product_type = PRODUCT_TYPES[index % len(PRODUCT_TYPES)]
+        tile = 102000000 + index // len(PRODUCT_TYPES)
+        yield f'EUC_MER_{product_type}_TILE{tile}-{index % 0xFFFFFF:06X}_20241105T125727.727353Z_00.00.fits'
+
+
+def _time(count, fn):
+    names = list(synthetic_names(count))
+    start = perf_counter()
+    for name in names:
+        fn(name)
+    return (perf_counter() - start) / count * 1e9
+
+
+def _storage_name(name):
+    storage_name = EUCLIDName([name])
+    storage_name.is_auxiliary()
+    storage_name.is_weight()
+    return storage_name.product_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000000, help='number of synthetic names')
+    parser.add_argument('--output', help='JSON results file name, default is stdout')
+    args = parser.parse_args()
+    StorageName.collection = 'EUCLID'
+    StorageName.scheme = 'esa'
+    result = {
+        'count': args.count,
+        'parse_ns_per_name': _time(args.count, EUCLIDName.parse),
+        'storage_name_ns_per_name': _time(args.count, _storage_name),
+    }
+    write_result(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+"""
+Shared helpers for the benchmarks: latency summaries, allocation measurement, and JSON results.
+"""
+
+import json
+import math
+import sys
+import tracemalloc
+from time import perf_counter_ns
+
+
+__all__ = ['measure_allocations', 'percentile', 'summarize', 'time_call', 'write_result']
+
+
+def percentile(ordered, fraction):
+    """
+    :param ordered: sorted list of samples
+    :param fraction: float between 0 and 1
+    :return: the nearest-rank sample at fraction
+    """
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples_ns):
+    """
+    :param samples_ns: list of latencies, in ns
+    :return: dict of count, and p50, p99, mean and max, in microseconds
+    """
+    ordered = sorted(samples_ns)
+    return {
+        'count': len(ordered),
+        'p50_us': percentile(ordered, 0.50) / 1e3,
+        'p99_us': percentile(ordered, 0.99) / 1e3,
+        'mean_us': sum(ordered) / len(ordered) / 1e3,
+        'max_us': ordered[-1] / 1e3,
+    }
+
+
+def measure_allocations(fn, *args, **kwargs):
+    """
+    Calls fn once with tracemalloc running. Kept apart from the timed calls, because tracing slows allocation.
+
+    :return: dict of the bytes still allocated after the call, and the peak bytes allocated during the call
+    """
+    tracemalloc.start()
+    try:
+        before, ignore_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn(*args, **kwargs)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'retained_bytes': after - before, 'peak_bytes': peak - before}
+
+
+def time_call(fn, *args, **kwargs):
+    """:return: the latency of one call of fn, in ns"""
+    start = perf_counter_ns()
+    fn(*args, **kwargs)
+    return perf_counter_ns() - start
+
+
+def write_result(result, output=None):
+    if output:
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
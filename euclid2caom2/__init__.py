@@ -1,3 +1,23 @@
+from importlib import import_module
+
 from .composable import *  # noqa
-from .file2caom2_augmentation import *  # noqa
-from .main_app import *  # noqa
+
+# the config and mapping modules import caom2pipe, caom2utils and astropy, so their names are resolved on first use
+_LAZY_NAMES = {
+    'EUCLIDConfig': 'config',
+    'EUCLIDFits2caom2Visitor': 'file2caom2_augmentation',
+    'MappingContext': 'file2caom2_augmentation',
+    'EUCLIDMappingNIR': 'main_app',
+    'EUCLIDMappingVIS': 'main_app',
+    'EUCLIDName': 'main_app',
+    'EUCLIDNameParts': 'main_app',
+    'get_plane_role': 'main_app',
+    'update_catalogue_meta_release': 'main_app',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(import_module(f'.{module_name}', __name__), name)
@@ -72,19 +72,54 @@ application.
 
 'run' executes based on either provided lists of work, or files on disk.
 'run_incremental' executes incrementally, usually based on time-boxed intervals.
+
+The execution and mapping modules, and the caom2pipe, caom2utils and astropy modules they use, are imported when
+they are used, so importing this module stays cheap.
 """
 
 import logging
+import os
 import sys
 import traceback
+from datetime import datetime, timedelta, timezone
 
-from caom2pipe.run_composable import run_by_state_runner_meta, run_by_todo_runner_meta
-from euclid2caom2 import file2caom2_augmentation
-from euclid2caom2.main_app import EUCLIDName
+from euclid2caom2 import incremental
+from euclid2caom2.filter_store import FilterStore
+from euclid2caom2.metrics import stage_metrics
+from euclid2caom2.rate_limit import service_limits
+from euclid2caom2.tile_index import TileIndex
 
 
-META_VISITORS = [file2caom2_augmentation]
 DATA_VISITORS = []
+# persists SVO filter metadata between invocations, found in the working directory
+SVO_FILTER_FILE_NAME = 'svo_filters.yml'
+# stage timers and counters, found in the observable_directory, when observe_execution is True
+STAGE_METRICS_FILE_NAME = 'stage_metrics.jsonl'
+# the state.yml bookmark for incremental execution
+EUCLID_BOOKMARK = 'euclid_timestamp'
+# the products of the TILEs held by incremental execution, found in the working directory
+TILE_INDEX_FILE_NAME = 'tile_index.yml'
+
+
+def _get_config():
+    from euclid2caom2.config import EUCLIDConfig
+
+    config = EUCLIDConfig()
+    config.get_executors()
+    if config.observe_execution and config.observable_directory:
+        stage_metrics.open(os.path.join(config.observable_directory, STAGE_METRICS_FILE_NAME))
+    service_limits.open(config.rate_limits, config.rate_limit_latency, config.rate_limit_retries)
+    return config
+
+
+def _get_meta_visitors(config):
+    """Imports the mapping, on the first unit of work."""
+    from euclid2caom2 import file2caom2_augmentation, main_app
+
+    main_app.filter_store = FilterStore(
+        os.path.join(config.working_directory, SVO_FILTER_FILE_NAME), timedelta(days=config.svo_filter_max_age)
+    )
+    return [file2caom2_augmentation]
 
 
 def _run():
@@ -94,9 +129,22 @@ def _run():
     :return 0 if successful, -1 if there's any sort of failure. Return status
         is used by airflow for task instance management and reporting.
     """
-    return run_by_todo_runner_meta(
-        meta_visitors=META_VISITORS, data_visitors=DATA_VISITORS, storage_name_ctor=EUCLIDName
-    )
+    config = _get_config()
+    meta_visitors = _get_meta_visitors(config)
+    from euclid2caom2.main_app import EUCLIDName
+
+    if config.tile_batching or config.dry_run:
+        from euclid2caom2.tile_execute import run_by_todo_tile
+
+        return run_by_todo_tile(config, meta_visitors, EUCLIDName)
+    from caom2pipe.run_composable import run_by_todo_runner_meta
+
+    try:
+        return run_by_todo_runner_meta(
+            config=config, meta_visitors=meta_visitors, data_visitors=DATA_VISITORS, storage_name_ctor=EUCLIDName
+        )
+    finally:
+        stage_metrics.flush()
 
 
 def run():
@@ -114,9 +162,71 @@ def run():
 def _run_incremental():
     """Uses a state file with a timestamp to identify the work to be done.
     """
-    return run_by_state_runner_meta(
-        meta_visitors=META_VISITORS, data_visitors=DATA_VISITORS, storage_name_ctor=EUCLIDName
-    )
+    config = _get_config()
+    tile_index_fqn = None
+    if (config.tile_batching or config.daemon) and config.hold_incomplete_tiles:
+        tile_index_fqn = os.path.join(config.working_directory, TILE_INDEX_FILE_NAME)
+    if not config.daemon and _is_idle(config, tile_index_fqn):
+        return 0
+    tile_index = None
+    if tile_index_fqn is not None:
+        tile_index = TileIndex(tile_index_fqn, timedelta(hours=config.incomplete_tile_timeout))
+    from euclid2caom2.data_source import EUCLIDInventoryDataSource
+
+    source = EUCLIDInventoryDataSource(config, config.inventory_page_size, config.inventory_max_files)
+    if config.daemon:
+        # the clients, caches and pools stay warm between polls
+        meta_visitors = _get_meta_visitors(config)
+        from euclid2caom2.main_app import EUCLIDName
+        from euclid2caom2.tile_execute import run_by_state_tile_daemon
+
+        return run_by_state_tile_daemon(config, meta_visitors, EUCLIDName, source, EUCLID_BOOKMARK, tile_index)
+    meta_visitors = _get_meta_visitors(config)
+    from euclid2caom2.main_app import EUCLIDName
+
+    if config.tile_batching:
+        from euclid2caom2.tile_execute import run_by_state_tile
+
+        return run_by_state_tile(config, meta_visitors, EUCLIDName, source, EUCLID_BOOKMARK, tile_index)
+    from caom2pipe.run_composable import run_by_state_runner_meta
+
+    try:
+        return run_by_state_runner_meta(
+            config=config,
+            meta_visitors=meta_visitors,
+            data_visitors=DATA_VISITORS,
+            sources=[source],
+            storage_name_ctor=EUCLIDName,
+        )
+    finally:
+        stage_metrics.flush()
+
+
+def _is_idle(config, tile_index_fqn):
+    """
+    :return: True when there are no files in the incremental window, and no held TILEs that have timed out, so
+        there is nothing for the mapping to do. In tile_batching mode, the bookmark is moved to the end of the empty
+        window.
+    """
+    if tile_index_fqn is not None:
+        # a held TILE that has not timed out only becomes ready with new files, which the probe finds
+        oldest = TileIndex.oldest(tile_index_fqn)
+        timeout = timedelta(hours=config.incomplete_tile_timeout)
+        if oldest is not None and datetime.now(tz=timezone.utc) - oldest > timeout:
+            return False
+    if not config.tile_batching:
+        # the caom2pipe runner owns the bookmark
+        return False
+    from caom2pipe import manage_composable as mc
+
+    state = mc.State(config.state_fqn)
+    prev_exec_dt = state.get_bookmark(EUCLID_BOOKMARK)
+    end_dt = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    if incremental.has_work(config, prev_exec_dt, end_dt):
+        return False
+    logging.info(f'No work from {prev_exec_dt} to {end_dt}.')
+    incremental.save_bookmark(config.state_fqn, EUCLID_BOOKMARK, end_dt)
+    return True
 
 
 def run_incremental():
@@ -0,0 +1,156 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+The Euclid-specific config.yml values. It is a module of its own so that importing the entry point module does
+not import caom2pipe.
+"""
+
+import os
+
+from caom2pipe import manage_composable as mc
+
+
+__all__ = ['EUCLIDConfig']
+
+
+class EUCLIDConfig(mc.Config):
+    """Adds the Euclid-specific config.yml values to the caom2pipe Config."""
+
+    def __init__(self):
+        super().__init__()
+        # when True, all the files of a TILE are applied to one Observation, with one repository read and write
+        self.tile_batching = False
+        # the number of TILEs executed concurrently, when tile_batching is True
+        self.tile_workers = 1
+        # when True, and tile_batching is True, storage and repository calls for many files and TILEs overlap
+        self.async_io = False
+        # when > 0, and tile_batching is True, the metadata mapping is done in this many processes
+        self.mapping_processes = 0
+        # when True, TILEs are mapped in memory only, with a per-TILE summary instead of repository writes
+        self.dry_run = False
+        # when True, and tile_batching is True, incremental execution holds a TILE until all its products arrive
+        self.hold_incomplete_tiles = False
+        # hours after the first product of a TILE arrives before an incomplete TILE is executed anyway
+        self.incomplete_tile_timeout = 24
+        # when True, incremental execution is a resident service that polls every poll_interval seconds
+        self.daemon = False
+        self.poll_interval = 30
+        # the number of concurrent storage (info, headers) and repository calls when async_io is True
+        self.data_concurrency = 16
+        self.metadata_concurrency = 4
+        # the starting calls per second to the 'data', 'metadata' and 'inventory' services, adapted to their latency
+        # and errors. A service without a value is not limited.
+        self.rate_limits = {}
+        self.rate_limit_latency = 5.0
+        self.rate_limit_retries = 10
+        # when set, and tile_batching is True, retrieved headers are kept in this directory, by URI and checksum
+        self.header_store_directory = None
+        # when True, the file information and headers come only from the header_store_directory
+        self.header_store_offline = False
+        # when True, and tile_batching is True, the headers of all the files of a TILE are retrieved concurrently
+        self.header_prefetch = False
+        # when True, and tile_batching is True, files with the checksum and size of their existing Artifact are skipped
+        self.skip_unchanged = False
+        # when True, and tile_batching is True, Planes without a position get the footprint of their science mosaic
+        self.plane_footprints = False
+        # when > 0, and tile_batching is True, the todo file is read this many entries at a time
+        self.todo_window = 0
+        # the rows per page when querying the storage inventory for incremental work
+        self.inventory_page_size = 1000
+        # the number of files per incremental time-box above which the time-box is shortened
+        self.inventory_max_files = 5000
+        # days before the SVO filter values in SVO_FILTER_FILE_NAME are retrieved again
+        self.svo_filter_max_age = 30
+
+    def get_executors(self):
+        super().get_executors()
+        values = mc.read_as_yaml(os.path.join(os.getcwd(), 'config.yml'))
+        self.tile_batching = values.get('tile_batching', False)
+        self.tile_workers = values.get('tile_workers', 1)
+        self.todo_window = values.get('todo_window', 0)
+        self.skip_unchanged = values.get('skip_unchanged', False)
+        self.plane_footprints = values.get('plane_footprints', False)
+        self.async_io = values.get('async_io', False)
+        self.mapping_processes = values.get('mapping_processes', 0)
+        self.dry_run = values.get('dry_run', False)
+        self.hold_incomplete_tiles = values.get('hold_incomplete_tiles', False)
+        self.incomplete_tile_timeout = values.get('incomplete_tile_timeout', 24)
+        self.daemon = values.get('daemon', False)
+        self.poll_interval = values.get('poll_interval', 30)
+        self.header_prefetch = values.get('header_prefetch', False)
+        self.header_store_directory = values.get('header_store_directory')
+        self.header_store_offline = values.get('header_store_offline', False)
+        self.data_concurrency = values.get('data_concurrency', 16)
+        self.metadata_concurrency = values.get('metadata_concurrency', 4)
+        self.rate_limits = values.get('rate_limits', {})
+        self.rate_limit_latency = values.get('rate_limit_latency', 5.0)
+        self.rate_limit_retries = values.get('rate_limit_retries', 10)
+        self.svo_filter_max_age = values.get('svo_filter_max_age', 30)
+        self.inventory_page_size = values.get('inventory_page_size', 1000)
+        self.inventory_max_files = values.get('inventory_max_files', 5000)
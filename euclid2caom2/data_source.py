@@ -0,0 +1,164 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Identifies the Euclid work to be done incrementally, from the storage inventory.
+"""
+
+import logging
+from collections import deque
+from datetime import timedelta
+from os.path import basename
+
+from cadctap import CadcTapClient
+from caom2pipe import client_composable as clc
+from caom2pipe import data_source_composable as dsc
+from caom2pipe import manage_composable as mc
+from euclid2caom2.incremental import page_query
+from euclid2caom2.main_app import EUCLIDName
+from euclid2caom2.rate_limit import service_limits
+
+
+__all__ = ['EUCLIDInventoryDataSource']
+
+
+class EUCLIDInventoryDataSource(dsc.DataSource):
+    """
+    Queries the storage inventory TAP service (storage_inventory_tap_resource_id) for the Euclid MER files that
+    were modified in a time-box.
+
+    - the query is limited to esa:EUCLID/EUC_MER_*, and ordered by lastModified, then uri
+    - results are retrieved a page at a time, with keyset pagination on (lastModified, uri), so no single query
+      grows with the size of a delivery
+    - the work is handed over tile-complete: the files of one TILE are adjacent in the result, and all carry
+      the latest lastModified of the TILE, so a bookmark taken from the work never falls part-way through a TILE
+    - files whose names do not follow the EUCLIDName naming rules are logged and skipped
+    - the interval property adapts to the number of files found in the last time-box, between MIN_INTERVAL and
+      MAX_INTERVAL, halving when there are more than max_files, and doubling when there are fewer than a
+      quarter of that. Only the tile_batching and daemon execution reads it - the caom2pipe
+      run_by_state_runner_meta time-boxes are always config.interval minutes long
+    """
+
+    MIN_INTERVAL = timedelta(minutes=1)
+    MAX_INTERVAL = timedelta(days=1)
+
+    def __init__(self, config, page_size=1000, max_files=5000):
+        super().__init__(config)
+        self._page_size = page_size
+        self._max_files = max_files
+        self.interval = timedelta(minutes=config.interval)
+        self._logger = logging.getLogger(self.__class__.__name__)
+        subject = clc.define_subject(config)
+        self._client = CadcTapClient(subject, resource_id=config.storage_inventory_tap_resource_id)
+
+    def get_time_box_work(self, prev_exec_dt, exec_dt):
+        """
+        :param prev_exec_dt: datetime start of the time-box, exclusive
+        :param exec_dt: datetime end of the time-box, inclusive
+        :return: deque of StateRunnerMeta, the files of each TILE adjacent, in the order each TILE was first seen
+        """
+        self._logger.debug(f'Begin get_time_box_work from {prev_exec_dt} to {exec_dt}.')
+        tiles = {}
+        count = 0
+        after_dt = prev_exec_dt
+        after_uri = None
+        while True:
+            rows = self._query_page(after_dt, after_uri, exec_dt)
+            for row in rows:
+                uri = row['uri']
+                entry_dt = mc.make_datetime(row['lastModified'])
+                after_dt = entry_dt
+                after_uri = uri
+                try:
+                    tile = EUCLIDName.parse(basename(uri)).tile
+                except mc.CadcException as e:
+                    self._logger.warning(f'Skipping {uri}: {e}')
+                    continue
+                tiles.setdefault(tile, []).append((uri, entry_dt))
+            count += len(rows)
+            if len(rows) < self._page_size:
+                break
+
+        result = deque()
+        for entries in tiles.values():
+            tile_dt = max(entry_dt for ignore_uri, entry_dt in entries)
+            for uri, ignore_dt in entries:
+                result.append(dsc.StateRunnerMeta(uri, tile_dt))
+        self._adapt_interval(count)
+        self._logger.info(f'Found {count} files in {len(tiles)} TILEs from {prev_exec_dt} to {exec_dt}.')
+        return result
+
+    def _adapt_interval(self, count):
+        if count > self._max_files:
+            self.interval = max(self.interval / 2, EUCLIDInventoryDataSource.MIN_INTERVAL)
+        elif count < self._max_files / 4:
+            self.interval = min(self.interval * 2, EUCLIDInventoryDataSource.MAX_INTERVAL)
+
+    def _query_page(self, after_dt, after_uri, exec_dt):
+        query = page_query(after_dt, after_uri, exec_dt, self._page_size)
+        return service_limits.call('inventory', clc.query_tap_client, query, self._client)
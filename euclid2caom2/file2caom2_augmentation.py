@@ -67,12 +67,76 @@
 #
 
 
-from caom2utils.parsers import BlueprintParser, FitsParser
+from collections import namedtuple
+from functools import lru_cache
+
+from caom2utils.parsers import BlueprintParser, ContentParser, FitsParser
 from caom2pipe import caom_composable as cc
+from caom2pipe import manage_composable as mc
 from euclid2caom2 import main_app
+from euclid2caom2.metrics import stage_metrics, storage_name_labels
+from euclid2caom2.wcs_memo import MemoizedFitsWcsParser
+
+
+__all__ = ['EUCLIDFits2caom2Visitor', 'MappingContext']
+
+
+# the Observation, Plane and Artifact attributes that are not copied from a fragment
+MERGE_EXCLUDED = frozenset(
+    [
+        'acc_meta_checksum',
+        'artifacts',
+        'chunks',
+        'collection',
+        'last_modified',
+        'max_last_modified',
+        'members',
+        'meta_checksum',
+        'observation_id',
+        'parts',
+        'planes',
+        'product_id',
+        'uri',
+    ]
+)
+# everything map_fragment needs for one file, with no clients, reporter or Observation, so it can be pickled
+MappingContext = namedtuple('MappingContext', 'source_names uri headers file_info config filter_energy')
+
 
+class EUCLIDBlueprintParser(BlueprintParser):
+    # the stage_metrics labels for the file being parsed
+    metric_labels = {}
 
-__all__ = ['EUCLIDFits2caom2Visitor']
+    def augment_observation(self, observation, artifact_uri, product_id=None):
+        with stage_metrics.timer('evaluate', **self.metric_labels):
+            return super().augment_observation(observation, artifact_uri, product_id)
+
+
+class EUCLIDFitsParser(FitsParser):
+    # the stage_metrics labels for the file being parsed
+    metric_labels = {}
+
+    def augment_observation(self, observation, artifact_uri, product_id=None):
+        with stage_metrics.timer('evaluate', **self.metric_labels):
+            return super().augment_observation(observation, artifact_uri, product_id)
+
+    def augment_artifact(self, artifact):
+        """
+        FitsParser.augment_artifact builds its FitsWcsParser instances inline, with no hook for another class, so
+        this is the same loop, with a MemoizedFitsWcsParser, which re-uses WCS results across the products of a
+        TILE. test_wcs_memo.test_euclid_fits_parser checks it against the caom2utils release pinned in setup.cfg.
+        """
+        self.logger.debug(f'Begin artifact augmentation for {artifact.uri} with {len(self.headers)} HDUs.')
+        if self.blueprint.get_configed_axes_count() == 0:
+            raise TypeError(f'No WCS Data. End artifact augmentation for {artifact.uri}.')
+        for i, header in enumerate(self.headers):
+            if not self.add_parts(artifact, i):
+                # artifact-level attributes still require updating
+                BlueprintParser.augment_artifact(self, artifact)
+                continue
+            self._wcs_parsers[i] = MemoizedFitsWcsParser(header, self.file, str(i))
+        ContentParser.augment_artifact(self, artifact)
+        self.logger.debug(f'End artifact augmentation for {artifact.uri}.')
 
 
 class EUCLIDFits2caom2Visitor(cc.Fits2caom2VisitorRunnerMeta):
@@ -111,13 +175,177 @@ class EUCLIDFits2caom2Visitor(cc.Fits2caom2VisitorRunnerMeta):
 
     def _get_parser(self, blueprint, uri):
         headers = self._storage_name.metadata.get(uri)
-        if headers is None or len(headers) == 0 or self._storage_name.is_auxiliary():
-            parser = BlueprintParser(blueprint, uri)
-        else:
-            parser = FitsParser(headers, blueprint, uri)
+        labels = storage_name_labels(self._storage_name)
+        with stage_metrics.timer('parser', **labels):
+            if headers is None or len(headers) == 0 or self._storage_name.is_auxiliary():
+                parser = EUCLIDBlueprintParser(blueprint, uri)
+            else:
+                parser = EUCLIDFitsParser(headers, blueprint, uri)
+        parser.metric_labels = labels
         self._logger.debug(f'Created {parser.__class__.__name__} parser for {uri}.')
         return parser
 
 
+def get_hdu_count(storage_name):
+    """
+    Tells the header retrieval how many HDU headers the mapping uses for a file.
+
+    :return: 1 for the auxiliary and catalogue files, which are mapped from the primary header only, or None for
+        the headers of all the HDUs
+    """
+    return 1 if storage_name.is_auxiliary() else None
+
+
+def get_header_keywords(storage_name):
+    """
+    Tells the header retrieval which keywords the mapping uses for a file, so that the headers of the auxiliary and
+    catalogue files, which are not given to a FitsParser, can be keyword to value mappings, instead of fits.Header
+    instances.
+
+    :return: set of keywords, or None when the mapping needs fits.Header instances
+    """
+    return main_app.EUCLIDMappingAuxiliary.HEADER_KEYWORDS if storage_name.is_auxiliary() else None
+
+
 def visit(observation, **kwargs):
-    return EUCLIDFits2caom2Visitor(observation, **kwargs).visit()
+    with stage_metrics.timer('visit', **storage_name_labels(kwargs.get('storage_name'))):
+        return EUCLIDFits2caom2Visitor(observation, **kwargs).visit()
+
+
+def get_mapping_context(storage_name, config):
+    """
+    Tells a TileExecutor with a mapping process pool what map_fragment needs for a file. The SVO filter values
+    are retrieved here, in the parent process, which has the filter_store.
+
+    :return: list of MappingContext, one per destination URI
+    """
+    config_subset = mc.Config()
+    for name in main_app.MAPPING_CONFIG_ATTRIBUTES:
+        setattr(config_subset, name, getattr(config, name))
+    result = []
+    for uri in storage_name.destination_uris:
+        headers = storage_name.metadata.get(uri)
+        filter_energy = {}
+        if not storage_name.is_auxiliary():
+            for header in headers or [{}]:
+                # the filter name look-up of EUCLIDMappingNIR._get_energy_function_*
+                filter_name = header.get('FILTER') or storage_name.get_filter_name()
+                filter_energy[filter_name] = main_app.get_filter_energy(filter_name)
+        result.append(
+            MappingContext(
+                storage_name.source_names,
+                uri,
+                headers,
+                storage_name.file_info.get(uri),
+                config_subset,
+                filter_energy,
+            )
+        )
+    return result
+
+
+class _FragmentReporter:
+    # the mapping only needs the observable, for its clients, and there are no clients in a mapping process
+    observable = None
+
+
+def map_fragment(contexts):
+    """
+    The metadata mapping for one file, as a pure function, for a mapping process.
+
+    :param contexts: list of MappingContext, from get_mapping_context
+    :return: Observation with only the Plane and Artifacts for the file, to be given to merge_fragment
+    """
+    config = contexts[0].config
+    mc.StorageName.collection = config.collection
+    mc.StorageName.scheme = config.scheme
+    mc.StorageName.preview_scheme = config.preview_scheme
+    mc.StorageName.data_source_extensions = config.data_source_extensions
+    storage_name = main_app.EUCLIDName(contexts[0].source_names)
+    for context in contexts:
+        storage_name.metadata[context.uri] = context.headers
+        storage_name.file_info[context.uri] = context.file_info
+        main_app.filter_energy_values.update(context.filter_energy)
+    return EUCLIDFits2caom2Visitor(
+        None, clients=None, config=config, reporter=_FragmentReporter(), storage_name=storage_name
+    ).visit()
+
+
+def merge_fragment(observation, fragment):
+    """
+    Applies the result of map_fragment to the TILE Observation, in the parent process. As with the blueprint
+    values, an attribute the fragment does not have leaves the existing value in place, and the existing entities,
+    down to the Chunks, are updated, rather than replaced, so the repository sees the same entities.
+
+    :param observation: Observation, or None before the first file of a new TILE
+    :param fragment: Observation from map_fragment
+    :return: Observation
+    """
+    if observation is None:
+        return fragment
+    _merge_attributes(observation, fragment)
+    for member in getattr(fragment, 'members', None) or []:
+        observation.members.add(member)
+    for product_id, fragment_plane in fragment.planes.items():
+        plane = observation.planes.get(product_id)
+        if plane is None:
+            observation.planes[product_id] = fragment_plane
+            continue
+        _merge_attributes(plane, fragment_plane)
+        for uri, fragment_artifact in fragment_plane.artifacts.items():
+            artifact = plane.artifacts.get(uri)
+            if artifact is None:
+                plane.artifacts[uri] = fragment_artifact
+            else:
+                _merge_artifact(artifact, fragment_artifact)
+    return observation
+
+
+def finish_observation(observation):
+    """
+    Tells a TileExecutor what to do once all the files of a TILE have been applied, before the Observation is
+    written: the Observation-wide updates that would otherwise be repeated for each file.
+    """
+    main_app.update_catalogue_meta_release(observation)
+    return observation
+
+
+@lru_cache(maxsize=None)
+def _get_merged_names(cls):
+    """:return: tuple of the names of the settable properties of a class, less MERGE_EXCLUDED"""
+    return tuple(
+        name
+        for name in dir(cls)
+        if isinstance(getattr(cls, name), property)
+        and getattr(cls, name).fset is not None
+        and name not in MERGE_EXCLUDED
+    )
+
+
+def _merge_attributes(current, fragment):
+    for name in _get_merged_names(type(fragment)):
+        fragment_value = getattr(fragment, name)
+        if fragment_value is None:
+            continue
+        current_value = getattr(current, name)
+        if type(current_value) is type(fragment_value) and _get_merged_names(type(fragment_value)):
+            # a sub-object, like target or provenance, is updated in place, as the blueprint does
+            _merge_attributes(current_value, fragment_value)
+        else:
+            setattr(current, name, fragment_value)
+
+
+def _merge_artifact(artifact, fragment_artifact):
+    _merge_attributes(artifact, fragment_artifact)
+    for name, fragment_part in fragment_artifact.parts.items():
+        part = artifact.parts.get(name)
+        if part is None:
+            artifact.parts[name] = fragment_part
+            continue
+        _merge_attributes(part, fragment_part)
+        # Chunks have no name, so they are matched by position
+        for index, fragment_chunk in enumerate(fragment_part.chunks):
+            if index < len(part.chunks):
+                _merge_attributes(part.chunks[index], fragment_chunk)
+            else:
+                part.chunks.append(fragment_chunk)
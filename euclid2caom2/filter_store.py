@@ -0,0 +1,174 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Implements a file-backed store of the SVO filter values used by the energy mapping, so that repeated pipeline
+invocations, and concurrent pipeline processes, do not query SVO for values that do not change.
+"""
+
+import fcntl
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from tempfile import NamedTemporaryFile
+
+import yaml
+
+
+__all__ = ['FilterStore']
+
+
+class FilterStore:
+    """
+    A write-through, versioned, YAML store of the central wavelength and FWHM for each filter, found in the
+    working directory. The content looks like:
+
+    version: 1
+    filters:
+      VIS:
+        central_wavelength: 7310.7619211456
+        fwhm: 3784.4194576686
+        retrieved: 2026-10-18T21:50:00.000000+00:00
+
+    Readers never lock - the file is only ever replaced atomically. Writers lock a sibling '.lock' file, and merge
+    with the content on disk, keeping the most recently retrieved entry for each filter, so concurrent processes
+    do not lose, or go back to older versions of, each other's entries.
+
+    Entries older than max_age are retrieved again. If that retrieval fails, the expired values are used, so a
+    slow or unavailable SVO does not stop ingestion for a filter that has been seen before.
+    """
+
+    VERSION = 1
+
+    def __init__(self, fqn, max_age=timedelta(days=30)):
+        self._fqn = fqn
+        self._lock_fqn = f'{fqn}.lock'
+        self._max_age = max_age
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._entries = self._read()
+
+    def get(self, filter_name, retrieve):
+        """
+        :param filter_name: str the filter, as named by the file headers
+        :param retrieve: callable that returns (central_wavelength, fwhm) for filter_name. Used when there is no
+            entry, or the entry has expired.
+        :return: tuple of (central_wavelength, fwhm)
+        """
+        entry = self._entries.get(filter_name)
+        if entry is None or self._is_expired(entry):
+            try:
+                central_wavelength, fwhm = retrieve(filter_name)
+            except Exception as e:
+                if entry is None:
+                    raise e
+                self._logger.warning(f'Using expired filter values for {filter_name} because {e}')
+                return entry['central_wavelength'], entry['fwhm']
+            entry = {
+                'central_wavelength': float(central_wavelength),
+                'fwhm': float(fwhm),
+                'retrieved': datetime.now(tz=timezone.utc).isoformat(),
+            }
+            self._write(filter_name, entry)
+        return entry['central_wavelength'], entry['fwhm']
+
+    def _is_expired(self, entry):
+        return datetime.now(tz=timezone.utc) - _retrieved(entry) > self._max_age
+
+    def _read(self):
+        result = {}
+        if os.path.exists(self._fqn):
+            try:
+                with open(self._fqn) as f:
+                    content = yaml.safe_load(f)
+                if content and content.get('version') == FilterStore.VERSION:
+                    result = content.get('filters', {})
+                else:
+                    self._logger.info(f'Ignoring {self._fqn} with an unsupported version.')
+            except Exception as e:
+                # the store is an optimization, so a damaged file is only a reason to query SVO
+                self._logger.warning(f'Ignoring {self._fqn} because {e}')
+        return result
+
+    def _write(self, filter_name, entry):
+        with open(self._lock_fqn, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._read()
+                for name, value in {**self._entries, filter_name: entry}.items():
+                    if name not in entries or _retrieved(value) > _retrieved(entries[name]):
+                        entries[name] = value
+                self._entries = entries
+                with NamedTemporaryFile('w', dir=os.path.dirname(self._fqn) or '.', delete=False) as f:
+                    yaml.safe_dump({'version': FilterStore.VERSION, 'filters': self._entries}, f)
+                os.replace(f.name, self._fqn)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _retrieved(entry):
+    return datetime.fromisoformat(entry['retrieved'])
@@ -0,0 +1,233 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Computes the spatial footprints of the chunks of a TILE, with NumPy, instead of one pixel at a time.
+
+The edge samples of every chunk with a gnomonic (TAN) Chunk.position.axis.function are transformed to world
+coordinates in one batch. Chunks with any other projection are transformed with an astropy Wcsprm, one chunk at a
+time, which is still one call for all the edge samples of that chunk.
+
+update_plane_positions gives each Plane without a position the footprint of its science chunk, once per TILE.
+"""
+
+import numpy as np
+from astropy.wcs import Wcsprm
+from caom2 import Point, Polygon, Position, ProductType, MultiPolygon, SegmentType, Vertex
+
+
+__all__ = ['chunk_footprints', 'observation_footprints', 'update_plane_positions']
+
+
+# the number of samples along each edge of a chunk, corners included
+EDGE_SAMPLES = 8
+
+
+def _edge_pixels(naxis1, naxis2, samples):
+    # the pixel edges, 1-based, counter-clockwise in pixel coordinates, starting from the lower-left corner
+    steps = np.linspace(0.0, 1.0, samples)[:-1]
+    x = np.concatenate([0.5 + steps * naxis1, np.full(steps.size, naxis1 + 0.5), naxis1 + 0.5 - steps * naxis1,
+                        np.full(steps.size, 0.5)])
+    y = np.concatenate([np.full(steps.size, 0.5), 0.5 + steps * naxis2, np.full(steps.size, naxis2 + 0.5),
+                        naxis2 + 0.5 - steps * naxis2])
+    return x, y
+
+
+def _is_tan(chunk):
+    return chunk.position.axis.axis1.ctype.endswith('-TAN') and chunk.position.axis.axis2.ctype.endswith('-TAN')
+
+
+def _function_arrays(functions):
+    crpix = np.array([[f.ref_coord.coord1.pix, f.ref_coord.coord2.pix] for f in functions])
+    crval = np.radians(np.array([[f.ref_coord.coord1.val, f.ref_coord.coord2.val] for f in functions]))
+    cd = np.array([[[f.cd11, f.cd12], [f.cd21, f.cd22]] for f in functions])
+    return crpix, crval, cd
+
+
+def _tan_pix2world(functions, samples):
+    """
+    :param functions: list of CoordFunction2D, with gnomonic projections, and the same dimensions
+    :return: ra, dec arrays in degrees, of shape (len(functions), number of edge samples)
+    """
+    x, y = _edge_pixels(functions[0].dimension.naxis1, functions[0].dimension.naxis2, samples)
+    crpix, crval, cd = _function_arrays(functions)
+    dx = x[np.newaxis, :] - crpix[:, 0:1]
+    dy = y[np.newaxis, :] - crpix[:, 1:2]
+    # intermediate world coordinates, in radians
+    xi = np.radians(cd[:, 0, 0:1] * dx + cd[:, 0, 1:2] * dy)
+    eta = np.radians(cd[:, 1, 0:1] * dx + cd[:, 1, 1:2] * dy)
+    sin_dec0 = np.sin(crval[:, 1:2])
+    cos_dec0 = np.cos(crval[:, 1:2])
+    denominator = cos_dec0 - eta * sin_dec0
+    ra = crval[:, 0:1] + np.arctan2(xi, denominator)
+    dec = np.arctan2(sin_dec0 + eta * cos_dec0, np.hypot(xi, denominator))
+    return np.mod(np.degrees(ra), 360.0), np.degrees(dec)
+
+
+def _wcsprm_pix2world(chunk, samples):
+    function = chunk.position.axis.function
+    x, y = _edge_pixels(function.dimension.naxis1, function.dimension.naxis2, samples)
+    wcs = Wcsprm(naxis=2)
+    wcs.ctype = [chunk.position.axis.axis1.ctype, chunk.position.axis.axis2.ctype]
+    wcs.crpix = [function.ref_coord.coord1.pix, function.ref_coord.coord2.pix]
+    wcs.crval = [function.ref_coord.coord1.val, function.ref_coord.coord2.val]
+    wcs.cd = [[function.cd11, function.cd12], [function.cd21, function.cd22]]
+    world = wcs.p2s(np.column_stack([x, y]), 1)['world']
+    return np.mod(world[:, 0], 360.0)[np.newaxis, :], world[:, 1][np.newaxis, :]
+
+
+def _to_polygon(ra, dec, function):
+    if function.cd11 * function.cd22 - function.cd12 * function.cd21 > 0.0:
+        # RA increases with the pixel x axis, so counter-clockwise in pixels is clockwise on the sky
+        ra = ra[::-1]
+        dec = dec[::-1]
+    points = [Point(float(lon), float(lat)) for lon, lat in zip(ra, dec)]
+    vertices = [Vertex(points[0].cval1, points[0].cval2, SegmentType.MOVE)]
+    vertices.extend(Vertex(point.cval1, point.cval2, SegmentType.LINE) for point in points[1:])
+    vertices.append(Vertex(0.0, 0.0, SegmentType.CLOSE))
+    return Polygon(points=points, samples=MultiPolygon(vertices))
+
+
+def chunk_footprints(chunks, samples=EDGE_SAMPLES):
+    """
+    :param chunks: list of Chunk
+    :param samples: int the number of samples along each edge of a chunk
+    :return: list of Polygon, in the order of chunks, with None for a chunk without a Chunk.position.axis.function
+    """
+    result = [None] * len(chunks)
+    # the gnomonic chunks, grouped by their dimensions, so that each group is one set of array operations
+    batches = {}
+    for index, chunk in enumerate(chunks):
+        if chunk.position is None or chunk.position.axis is None or chunk.position.axis.function is None:
+            continue
+        function = chunk.position.axis.function
+        if _is_tan(chunk):
+            dimension = (function.dimension.naxis1, function.dimension.naxis2)
+            batches.setdefault(dimension, []).append(index)
+        else:
+            ra, dec = _wcsprm_pix2world(chunk, samples)
+            result[index] = _to_polygon(ra[0], dec[0], function)
+    for indices in batches.values():
+        functions = [chunks[index].position.axis.function for index in indices]
+        ra, dec = _tan_pix2world(functions, samples)
+        for row, index in enumerate(indices):
+            result[index] = _to_polygon(ra[row], dec[row], functions[row])
+    return result
+
+
+def observation_footprints(observation, samples=EDGE_SAMPLES):
+    """
+    :param observation: Observation, all the products of a TILE
+    :param samples: int the number of samples along each edge of a chunk
+    :return: dict of Artifact URI to the list of Polygon, one per chunk with a spatial WCS function
+    """
+    chunks = []
+    uris = []
+    for plane in observation.planes.values():
+        for artifact in plane.artifacts.values():
+            for part in artifact.parts.values():
+                for chunk in part.chunks:
+                    chunks.append(chunk)
+                    uris.append(artifact.uri)
+    result = {}
+    for uri, polygon in zip(uris, chunk_footprints(chunks, samples)):
+        if polygon is not None:
+            result.setdefault(uri, []).append(polygon)
+    return result
+
+
+def update_plane_positions(observation, samples=EDGE_SAMPLES):
+    """
+    Sets Plane.position.bounds, for the Planes with no position, to the footprint of the first science chunk with a
+    spatial WCS function, or of the first chunk with one, when there are no science chunks. A Plane that already
+    has a position, from the repository, keeps it, because the repository computes the position of each Plane
+    it stores.
+
+    :param observation: Observation, all the products of a TILE
+    :param samples: int the number of samples along each edge of a chunk
+    :return: Observation
+    """
+    planes = []
+    chunks = []
+    for plane in observation.planes.values():
+        if plane.position is not None:
+            continue
+        candidates = []
+        for artifact in plane.artifacts.values():
+            for part in artifact.parts.values():
+                for chunk in part.chunks:
+                    if chunk.position is not None and chunk.position.axis is not None:
+                        if chunk.position.axis.function is not None:
+                            candidates.append((artifact.product_type != ProductType.SCIENCE, chunk))
+        if candidates:
+            planes.append(plane)
+            chunks.append(min(candidates, key=lambda candidate: candidate[0])[1])
+    # one batch for all the Planes of the TILE
+    for plane, polygon in zip(planes, chunk_footprints(chunks, samples)):
+        plane.position = Position(bounds=polygon)
+    return observation
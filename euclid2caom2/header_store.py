@@ -0,0 +1,212 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+A local, content-addressed store of retrieved FITS headers, so Observations can be re-derived after a mapping change
+without retrieving the headers from storage again.
+
+Layout, under the store directory:
+- headers/<sha256 of uri and md5sum>.zz - the headers for one version of a file, as zlib-compressed JSON, with one
+  list of [keyword, value, comment] cards per HDU
+- files/<sha256 of uri>.json - the file information for the most recently stored version of a file, so the store
+  can be used without network access
+"""
+
+import json
+import logging
+import os
+import zlib
+from hashlib import sha256
+from tempfile import NamedTemporaryFile
+
+from astropy.io import fits
+from cadcdata import FileInfo
+from caom2pipe import manage_composable as mc
+
+
+__all__ = ['from_cards', 'HeaderStore', 'to_cards']
+
+
+def to_cards(headers):
+    """
+    :param headers: list of astropy.io.fits.Header
+    :return: list, per HDU, of [keyword, value, comment] lists, that can be written as JSON
+    """
+    result = []
+    for header in headers:
+        cards = []
+        for card in header.cards:
+            value = card.value
+            if isinstance(value, fits.card.Undefined):
+                value = None
+            elif isinstance(value, complex):
+                value = str(value)
+            cards.append([card.keyword, value, card.comment])
+        result.append(cards)
+    return result
+
+
+def from_cards(content):
+    """
+    :param content: list, from to_cards
+    :return: list of astropy.io.fits.Header
+    """
+    result = []
+    for cards in content:
+        header = fits.Header()
+        for keyword, value, comment in cards:
+            header.append(fits.Card(keyword, value, comment), useblanks=False, bottom=True)
+        result.append(header)
+    return result
+
+
+class HeaderStore:
+    """
+    Headers are stored with the number of HDUs that were retrieved, so that headers retrieved for the primary HDU
+    only are not mistaken for those of all the HDUs.
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def get(self, uri, md5sum, hdu_count=None):
+        """
+        :param uri: str Artifact URI
+        :param md5sum: str checksum of the file version, without a scheme
+        :param hdu_count: int the number of HDU headers needed, None for all of them
+        :return: list of astropy.io.fits.Header, or None if the store does not have enough of them
+        """
+        fqn = self._headers_fqn(uri, md5sum)
+        if not os.path.exists(fqn):
+            return None
+        with open(fqn, 'rb') as f:
+            content = json.loads(zlib.decompress(f.read()))
+        complete = content['hdu_count'] is None
+        if not complete and (hdu_count is None or hdu_count > content['hdu_count']):
+            return None
+        result = from_cards(content['headers'])
+        return result if hdu_count is None else result[:hdu_count]
+
+    def put(self, uri, md5sum, headers, hdu_count=None):
+        """
+        :param hdu_count: int the number of HDU headers that were requested, None if all of them were
+        """
+        if hdu_count is not None and len(headers) < hdu_count:
+            # the file has fewer HDUs than were requested, so these are all of them
+            hdu_count = None
+        content = {'hdu_count': hdu_count, 'headers': to_cards(headers)}
+        self._write(self._headers_fqn(uri, md5sum), zlib.compress(json.dumps(content, separators=(',', ':')).encode()))
+
+    def get_file_info(self, uri):
+        """
+        :return: cadcdata.FileInfo for the most recently stored version of the file
+        """
+        fqn = self._file_info_fqn(uri)
+        if not os.path.exists(fqn):
+            raise mc.CadcException(f'No file information for {uri} in the header store {self._directory}.')
+        with open(fqn) as f:
+            content = json.load(f)
+        return FileInfo(
+            uri,
+            size=content['size'],
+            name=content['name'],
+            md5sum=content['md5sum'],
+            lastmod=content['lastmod'],
+            file_type=content['file_type'],
+            encoding=content['encoding'],
+        )
+
+    def put_file_info(self, uri, file_info):
+        content = {
+            'uri': uri,
+            'size': file_info.size,
+            'name': file_info.name,
+            'md5sum': file_info.md5sum,
+            'lastmod': None if file_info.lastmod is None else str(file_info.lastmod),
+            'file_type': file_info.file_type,
+            'encoding': file_info.encoding,
+        }
+        self._write(self._file_info_fqn(uri), json.dumps(content).encode())
+
+    def _headers_fqn(self, uri, md5sum):
+        key = sha256(f'{uri}:{md5sum}'.encode()).hexdigest()
+        return os.path.join(self._directory, 'headers', f'{key}.zz')
+
+    def _file_info_fqn(self, uri):
+        key = sha256(uri.encode()).hexdigest()
+        return os.path.join(self._directory, 'files', f'{key}.json')
+
+    def _write(self, fqn, content):
+        # write-then-rename, so concurrent readers never see part of an entry
+        directory = os.path.dirname(fqn)
+        os.makedirs(directory, exist_ok=True)
+        with NamedTemporaryFile(dir=directory, delete=False) as f:
+            f.write(content)
+        os.replace(f.name, fqn)
+        self._logger.debug(f'Wrote {fqn}.')
@@ -0,0 +1,264 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Implements FITS header retrieval for the TILE execution, when only some of the HDU headers, or only some of the
+keywords, of a file are used by the mapping.
+
+The fhead response of the storage service always has the headers of every HDU of a file, so the bytes transferred
+do not change. HeaderClient retrieves that response as text, through the public cadcdata StorageInventoryClient, and
+discards the unused HDUs before any fits.Header is built, which is most of the cost for the catalogues, with their
+thousands of column definition cards. When the mapping says which keywords it uses, only those cards are parsed,
+into CompactHeader instances, and no fits.Header is built at all.
+"""
+
+import logging
+import traceback
+from datetime import datetime, timezone
+from io import BytesIO
+
+from cadcutils import exceptions
+from caom2utils import data_util
+
+
+__all__ = [
+    'CompactHeader',
+    'get_local_head',
+    'HeaderClient',
+    'parse_compact_headers',
+    'truncate_header_text',
+]
+
+
+class CompactHeader(dict):
+    """
+    The keyword to value mapping for the keywords of one HDU that a mapping uses, instead of a fits.Header. It
+    supports the header.get(keyword) and header[keyword] lookups of the mapping '_get_*' functions. It is parsed
+    from the header text without the card validation of a fits.Header, and is much smaller to keep, and to pickle
+    for a mapping process, than a catalogue fits.Header, with its thousands of column definition cards.
+    """
+
+
+def _parse_value(text):
+    text = text.lstrip()
+    if text.startswith("'"):
+        # a FITS string - '' is an embedded quote, and trailing blanks are not significant
+        result = []
+        index = 1
+        while index < len(text):
+            if text[index] == "'":
+                if text[index + 1:index + 2] != "'":
+                    break
+                index += 1
+            result.append(text[index])
+            index += 1
+        return ''.join(result).rstrip()
+    token = text.split('/', 1)[0].strip()
+    if token == '':
+        return None
+    if token in ('T', 'F'):
+        return token == 'T'
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token.replace('D', 'E'))
+    except ValueError:
+        return token
+
+
+def _cards(fits_header):
+    # a line of fhead output may hold more than one 80-character card
+    for line in fits_header.split('\n'):
+        for start in range(0, max(len(line), 1), 80):
+            yield line[start:start + 80]
+
+
+def parse_compact_headers(fits_header, keywords, hdu_count=None):
+    """
+    :param fits_header: str newline-separated header cards, as returned by fhead
+    :param keywords: set of str the keywords to keep
+    :param hdu_count: int the number of HDU headers to keep, or None for all of them
+    :return: list of CompactHeader, one per HDU
+    """
+    result = []
+    current = CompactHeader()
+    # the keyword of a kept long string value, that is continued on CONTINUE cards
+    continued = None
+    for line in _cards(fits_header):
+        keyword = line[:8].rstrip()
+        if keyword == 'CONTINUE':
+            if continued is not None:
+                current[continued] = current[continued][:-1] + (_parse_value(line[8:]) or '')
+                if not current[continued].endswith('&'):
+                    continued = None
+            continue
+        continued = None
+        if keyword == 'END':
+            result.append(current)
+            if len(result) == hdu_count:
+                break
+            current = CompactHeader()
+        elif keyword in keywords and line[8:10] == '= ':
+            value = _parse_value(line[10:])
+            current[keyword] = value
+            if isinstance(value, str) and value.endswith('&'):
+                continued = keyword
+    return result
+
+
+def truncate_header_text(fits_header, hdu_count):
+    """
+    :param fits_header: str newline-separated header cards, for all the HDUs of a file, as returned by fhead
+    :param hdu_count: int the number of HDU headers to keep
+    :return: str the cards of the first hdu_count HDUs
+    """
+    result = []
+    found = 0
+    for line in fits_header.split('\n'):
+        result.append(line)
+        if line.strip() == 'END':
+            found += 1
+            if found == hdu_count:
+                break
+    return '\n'.join(result)
+
+
+class HeaderClient:
+    """
+    StorageClientWrapper.get_head, with the parsing left to the caller. A failed retrieval has the same metrics,
+    logging and exception as StorageClientWrapper.get_head.
+    """
+
+    def __init__(self, cadc_client, metrics=None):
+        """
+        :param cadc_client: cadcdata.StorageInventoryClient
+        :param metrics: caom2pipe.manage_composable.Metrics, or None
+        """
+        self._cadc_client = cadc_client
+        self._metrics = metrics
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def get_text(self, uri):
+        """
+        :param uri: str Artifact URI
+        :return: str the fhead response, newline-separated header cards for every HDU of the file
+        """
+        self._logger.debug(f'Begin get_text for {uri}')
+        start = datetime.now(tz=timezone.utc).timestamp()
+        try:
+            b = BytesIO()
+            b.name = uri
+            self._cadc_client.cadcget(uri, b, fhead=True)
+            result = b.getvalue().decode('ascii')
+        except Exception as e:
+            if self._metrics is not None:
+                self._metrics.observe_failure('get_head', 'si', uri)
+            self._logger.debug(traceback.format_exc())
+            self._logger.error(e)
+            raise exceptions.UnexpectedException(f'Did not retrieve {uri} header because {e}')
+        if self._metrics is not None:
+            self._metrics.observe(start, datetime.now(tz=timezone.utc).timestamp(), len(result), 'get_head', 'si', uri)
+        self._logger.debug('End get_text')
+        return result
+
+    def get_head(self, uri, hdu_count=None):
+        """
+        Retrieve the headers of the first hdu_count HDUs of a file.
+
+        :param uri: str Artifact URI
+        :param hdu_count: int the number of HDU headers the mapping uses, or None for all of them
+        :return: list of fits.Header instances
+        """
+        fits_header = self.get_text(uri)
+        if hdu_count is not None:
+            fits_header = truncate_header_text(fits_header, hdu_count)
+        return data_util.make_headers_from_string(fits_header)
+
+    def get_compact_head(self, uri, keywords, hdu_count=None):
+        """
+        Retrieve only the keyword values a mapping uses, without building fits.Header instances, which validate every
+        card.
+
+        :param uri: str Artifact URI
+        :param keywords: set of str the keywords the mapping uses
+        :param hdu_count: int the number of HDU headers the mapping uses, or None for all of them
+        :return: list of CompactHeader instances
+        """
+        return parse_compact_headers(self.get_text(uri), keywords, hdu_count)
+
+
+def get_local_head(fqn, hdu_count=None):
+    """
+    :param fqn: str fully-qualified name of the file on disk
+    :param hdu_count: int the number of HDU headers the mapping uses, or None for all of them
+    :return: list of fits.Header instances
+    """
+    headers = data_util.get_local_file_headers(fqn)
+    return headers if hdu_count is None else headers[:hdu_count]
@@ -0,0 +1,164 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+"""
+The parts of incremental execution that run before there is any work: the storage inventory query text, a probe
+for whether a time window has any files, and the bookmark save.
+
+This module imports cadctap only when probing, caom2pipe only when saving the bookmark, and never caom2utils, so
+an incremental run with an empty window stays cheap.
+"""
+
+import os
+import shutil
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from euclid2caom2.rate_limit import service_limits
+
+
+__all__ = ['has_work', 'page_query', 'save_bookmark']
+
+
+# the Euclid MER files in the storage inventory
+URI_PATTERN = 'esa:EUCLID/EUC_MER_%'
+
+
+def _to_adql(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+
+
+def page_query(after_dt, after_uri, exec_dt, top):
+    """
+    :param after_dt: datetime the lastModified to start after, exclusive
+    :param after_uri: str the last uri of the previous page with lastModified == after_dt, or None for the first page
+    :param exec_dt: datetime the end of the time-box, inclusive
+    :param top: int the most rows to return
+    :return: str ADQL for one page of the files, ordered by lastModified, then uri
+    """
+    after = _to_adql(after_dt)
+    if after_uri is None:
+        keyset = f"A.lastModified > '{after}'"
+    else:
+        keyset = f"(A.lastModified > '{after}' OR (A.lastModified = '{after}' AND A.uri > '{after_uri}'))"
+    return f"""
+            SELECT TOP {top} A.uri, A.lastModified
+            FROM inventory.Artifact AS A
+            WHERE A.uri LIKE '{URI_PATTERN}'
+            AND {keyset}
+            AND A.lastModified <= '{_to_adql(exec_dt)}'
+            ORDER BY A.lastModified, A.uri
+        """
+
+
+def _get_subject(config):
+    from cadcutils import net
+
+    # clc.define_subject, without importing the caom2pipe clients
+    if config.proxy_fqn is not None and os.path.exists(config.proxy_fqn):
+        return net.Subject(certificate=config.proxy_fqn)
+    if getattr(config, 'netrc_file', None) is not None:
+        return net.Subject(netrc=os.path.join(config.working_directory, config.netrc_file))
+    return net.Subject()
+
+
+def has_work(config, prev_exec_dt, exec_dt):
+    """
+    A single-row query, with the rows returned as text, so no table parsing is imported.
+
+    :param config: Config instance, with values already retrieved
+    :param prev_exec_dt: datetime start of the window, exclusive
+    :param exec_dt: datetime end of the window, inclusive
+    :return: bool True if any file was modified in the window
+    """
+    from cadctap import CadcTapClient
+
+    client = CadcTapClient(_get_subject(config), resource_id=config.storage_inventory_tap_resource_id)
+    buffer = StringIO()
+    service_limits.call(
+        'inventory',
+        client.query,
+        page_query(prev_exec_dt, None, exec_dt, 1),
+        output_file=buffer,
+        response_format='csv',
+        no_column_names=True,
+    )
+    return buffer.getvalue().strip() != ''
+
+
+def save_bookmark(state_fqn, bookmark_name, exec_dt):
+    """
+    Updates a copy of the state file, and replaces the state file with it, so a stop part-way through a save never
+    leaves a truncated bookmark.
+    """
+    with NamedTemporaryFile(dir=os.path.dirname(state_fqn) or '.', suffix='.yml', delete=False) as f:
+        pass
+    shutil.copyfile(state_fqn, f.name)
+    from caom2pipe import manage_composable as mc
+
+    mc.State(f.name).save_state(bookmark_name, exec_dt)
+    os.replace(f.name, state_fqn)
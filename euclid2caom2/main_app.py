@@ -70,22 +70,83 @@
 This module implements the ObsBlueprint mapping, as well as the workflow entry point that executes the workflow.
 """
 
+import re
+from collections import namedtuple
 from datetime import timedelta
 from os.path import basename
+from threading import RLock
 
 from caom2 import CalibrationLevel, Chunk, DataProductType, ProductType, ReleaseType, TypedList
 from caom2pipe.astro_composable import FilterMetadataCache
 from caom2pipe import caom_composable as cc
 from caom2pipe import manage_composable as mc
+from euclid2caom2.metrics import stage_metrics, storage_name_labels
 
 
 __all__ = [
     'EUCLIDMappingNIR',
     'EUCLIDMappingVIS',
     'EUCLIDName',
+    'EUCLIDNameParts',
+    'get_plane_role',
+    'update_catalogue_meta_release',
 ]
 
 
+# the Config attributes the mapping uses, which are copied to a mapping process, and which key the
+# BlueprintTemplate cache
+MAPPING_CONFIG_ATTRIBUTES = (
+    'collection',
+    'data_read_groups',
+    'data_source_extensions',
+    'logging_level',
+    'meta_read_groups',
+    'preview_scheme',
+    'scheme',
+    'task_types',
+    'tile_batching',
+    'use_local_files',
+    'working_directory',
+)
+# the most BlueprintTemplate instances kept at once - there are a few per mapping class and Config
+BLUEPRINT_TEMPLATE_LIMIT = 32
+
+
+# EUC_<processing level>_<product type>_<TILE>-<checksum fragment>_<timestamp>_<version>
+EUCLID_NAME_REGEX = re.compile(
+    r'^EUC_(?P<processing_level>[A-Z0-9]+)_(?P<product_type>[A-Z0-9-]+)_(?P<tile>TILE[0-9]+)-(?P<checksum>[0-9A-Za-z]+)'
+    r'(?:_(?P<timestamp>[0-9]{8}T[0-9.]+Z)_(?P<version>[0-9]+\.[0-9]+))?'
+)
+EUCLID_FILTERS = ('H', 'J', 'Y', 'VIS')
+# the roles of the Planes of a TILE Observation
+PLANE_ROLE_AUXILIARY = 'auxiliary'
+PLANE_ROLE_CATALOGUE = 'catalogue'
+PLANE_ROLE_SCIENCE = 'science'
+# the EUCLIDNameParts.product_type values of a complete TILE, as listed in the EUCLIDName docstring
+EUCLID_TILE_PRODUCT_TYPES = frozenset(
+    [
+        f'{prefix}{band}{suffix}'
+        for band in ('VIS', 'NIR-Y', 'NIR-J', 'NIR-H')
+        for prefix, suffix in [
+            ('BGSUB-MOSAIC-', ''),
+            ('BGMOD-', ''),
+            ('GRID-PSF-', ''),
+            ('MOSAIC-', '-RMS'),
+            ('MOSAIC-', '-FLAG'),
+            ('CATALOG-PSF-', ''),
+        ]
+    ]
+    + ['FINAL-CAT', 'FINAL-CUTOUTS-CAT', 'FINAL-MORPH-CAT']
+)
+
+# everything that's known from a Euclid file name, decoded once
+EUCLIDNameParts = namedtuple(
+    'EUCLIDNameParts',
+    'processing_level product_type instrument filter_name tile checksum timestamp version product_suffix auxiliary '
+    'weight',
+)
+
+
 class EUCLIDName(mc.StorageName):
     """Naming rules:
     - support mixed-case file name storage, and mixed-case obs id values
@@ -118,48 +179,131 @@ class EUCLIDName(mc.StorageName):
     EUCLID_NAME_PATTERN = '*'
 
     def __init__(self, source_names):
+        self._parts = None
         super().__init__(file_name=basename(source_names[0]), source_names=source_names)
 
+    @property
+    def parts(self):
+        """The EUCLIDNameParts decoded from the file name."""
+        return self._parts
+
     def get_filter_name(self):
-        result = self._product_id.split('_')[-1]
-        if result not in ['H', 'J', 'Y', 'VIS']:
+        result = self._parts.filter_name
+        if result is None:
             raise mc.CadcException(f'Calling get_filter_name when it cannot answer correctly.')
         return result
 
     def is_auxiliary(self):
-        return (
-            '-CAT_' in self._file_name
-            or '_CATALOG-' in self._file_name
-            or '_BGMOD-' in self._file_name
-            or '_GRID-PSF-' in self._file_name
-            or '-FLAG_' in self._file_name
-        )
+        return self._parts.auxiliary
 
     def is_valid(self):
         return True
 
     def is_weight(self):
-        return '_MOSAIC-' in self._file_name and '-RMS_' in self._file_name
+        return self._parts.weight
 
     def set_obs_id(self, **kwargs):
-        bits = self._file_name.split('_')
-        self._obs_id = bits[3].split('-')[0]
-        if not self._obs_id.startswith('TILE'):
-            raise mc.CadcException(f'Unexpected naming pattern {self._file_name}')
+        # the first naming hook called by the StorageName constructor
+        self._parts = EUCLIDName.parse(self._file_name)
+        self._obs_id = self._parts.tile
 
     def set_product_id(self, **kwargs):
-        bits = self._file_name.split('_')
-        product_id_bits = bits[2].split('-')
-        if product_id_bits[-1] == 'CAT' and len(product_id_bits) == 3:
-            self._product_id = f'{self._obs_id}_{'_'.join(product_id_bits[-2:])}'
+        self._product_id = f'{self._obs_id}_{self._parts.product_suffix}'
+
+    @staticmethod
+    def parse(file_name):
+        """
+        Decode a Euclid file name in one pass.
+
+        :param file_name: str the file name, with or without extensions
+        :return: EUCLIDNameParts
+        """
+        match = EUCLID_NAME_REGEX.match(file_name)
+        if match is None:
+            raise mc.CadcException(f'Unexpected naming pattern {file_name}')
+        processing_level, product_type, tile, checksum, timestamp, version = match.groups()
+        bits = product_type.split('-')
+        if bits[-1] == 'CAT' and len(bits) == 3:
+            # FINAL-CUTOUTS-CAT, FINAL-MORPH-CAT
+            product_suffix = f'{bits[-2]}_{bits[-1]}'
+        elif bits[0] == 'MOSAIC':
+            # MOSAIC-VIS-RMS, MOSAIC-NIR-Y-FLAG
+            product_suffix = bits[-2]
         else:
-            if product_id_bits[0] == 'MOSAIC':
-                self._product_id = f'{self._obs_id}_{product_id_bits[-2]}'
-            else:
-                self._product_id = f'{self._obs_id}_{product_id_bits[-1]}'
+            product_suffix = bits[-1]
+        if 'NIR' in bits:
+            instrument = 'NIR'
+        elif 'VIS' in bits:
+            instrument = 'VIS'
+        else:
+            instrument = None
+        auxiliary = (
+            (len(bits) > 1 and bits[-1] in ('CAT', 'FLAG'))
+            or bits[0] in ('CATALOG', 'BGMOD')
+            or (bits[0] == 'GRID' and len(bits) > 2 and bits[1] == 'PSF')
+        )
+        # positional, because this is called for every entry of a listing
+        return EUCLIDNameParts(
+            processing_level,
+            product_type,
+            instrument,
+            product_suffix if product_suffix in EUCLID_FILTERS else None,
+            tile,
+            checksum,
+            timestamp,
+            version,
+            product_suffix,
+            auxiliary,
+            bits[0] == 'MOSAIC' and bits[-1] == 'RMS',
+        )
+
+
+class BlueprintTemplate:
+    """
+    The state of an ObsBlueprint after accumulate_blueprint, without the per-file values. Applying a template to a
+    new ObsBlueprint replaces replaying every set/add_attribute/configure_* call for every file.
+
+    Each application gets its own copies of the plan dicts and keyword lists, so per-file set calls, and add_attribute
+    calls, never change the template.
+    """
+
+    def __init__(self, bp, instantiated_class):
+        # the instantiated_class reference, for '_get_*()' blueprint values, belongs to each ObsBlueprint
+        self._state = {
+            name: BlueprintTemplate._copy(value)
+            for name, value in vars(bp).items()
+            if value is not instantiated_class
+        }
+
+    def apply(self, bp):
+        for name, value in self._state.items():
+            setattr(bp, name, BlueprintTemplate._copy(value))
+
+    @staticmethod
+    def _copy(value):
+        if isinstance(value, dict):
+            return {key: BlueprintTemplate._copy(entry) for key, entry in value.items()}
+        if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], list):
+            # a keyword lookup - (list of keywords, default value)
+            return list(value[0]), value[1]
+        return value
+
+
+def _get_config_key(config):
+    result = []
+    for name in MAPPING_CONFIG_ATTRIBUTES:
+        value = getattr(config, name, None)
+        result.append(tuple(value) if isinstance(value, list) else value)
+    return tuple(result)
 
 
 class EUCLIDMappingAuxiliary(cc.TelescopeMapping2):
+    # BlueprintTemplate instances, keyed by mapping class, EUCLIDName traits, and the MAPPING_CONFIG_ATTRIBUTES
+    # values, in the order they were created
+    _blueprint_templates = {}
+    # the keywords used by the blueprint and the '_get_*' functions, when there is no FitsParser
+    HEADER_KEYWORDS = frozenset(['CRVAL1', 'CRVAL2', 'DATE', 'FILTER', 'SOFTINST', 'SOFTNAME'])
+
     def __init__(self, clients, config, dest_uri, observation, reporter, storage_name):
         self._reporter = reporter
         super().__init__(
@@ -174,6 +318,24 @@ class EUCLIDMappingAuxiliary(cc.TelescopeMapping2):
     def accumulate_blueprint(self, bp):
         """Configure the telescope-specific ObsBlueprint at the CAOM model Observation level."""
         self._logger.debug('Begin accumulate_bp.')
+        # the Config values, rather than the instance, because a mapping process gets a new Config for every file
+        key = (self.__class__, self._storage_name.is_weight(), _get_config_key(self._config))
+        templates = EUCLIDMappingAuxiliary._blueprint_templates
+        with stage_metrics.timer('blueprint', **storage_name_labels(self._storage_name)):
+            template = templates.get(key)
+            if template is None:
+                self._accumulate_template(bp)
+                if len(templates) >= BLUEPRINT_TEMPLATE_LIMIT:
+                    templates.pop(next(iter(templates)))
+                templates[key] = BlueprintTemplate(bp, self)
+            else:
+                template.apply(bp)
+        # the per-file values
+        bp.set('Observation.target.name', self._storage_name.obs_id)
+        self._logger.debug('Done accumulate_bp.')
+
+    def _accumulate_template(self, bp):
+        """The blueprint content that is the same for every file with the same BlueprintTemplate key."""
         super().accumulate_blueprint(bp)
         bp.set('DerivedObservation.members', {})
         # SGw - 10-12-24
@@ -183,7 +345,6 @@ class EUCLIDMappingAuxiliary(cc.TelescopeMapping2):
 
         bp.set('Observation.instrument.name', '_get_instrument_name()')
         bp.set('Observation.proposal.id', 'Q1')
-        bp.set('Observation.target.name', self._storage_name.obs_id)
         bp.add_attribute('Observation.target_position.point.cval1', 'CRVAL1')
         bp.add_attribute('Observation.target_position.point.cval2', 'CRVAL2')
         bp.set('Observation.target_position.coordsys', 'FK5')
@@ -227,24 +388,58 @@ class EUCLIDMappingAuxiliary(cc.TelescopeMapping2):
         pass
 
     def update(self):
+        with stage_metrics.timer('update', **storage_name_labels(self._storage_name)):
+            return self._update()
+
+    def _update(self):
         self._observation = super().update()
-        cat_plane_key = f'{self._observation.observation_id}_CAT'
-        morph_cat_plane_key = f'{self._observation.observation_id}_MORPH_CAT'
-        cutouts_cat_plane_key = f'{self._observation.observation_id}_CUTOUTS_CAT'
-        cat_keys = [cat_plane_key, morph_cat_plane_key, cutouts_cat_plane_key]
-        # TODO the 4th catalogue Plane
-        for plane in self._observation.planes.values():
-            if plane.product_id not in cat_keys:
-                for cat_key in cat_keys:
-                    if (
-                        cat_key in self._observation.planes.keys()
-                        and self._observation.planes[plane.product_id].meta_release is not None
-                        and self._observation.planes[cat_key].meta_release is None
-                    ):
-                        self._observation.planes[cat_key].meta_release = plane.meta_release
+        if not self._config.tile_batching:
+            # with tile_batching, once per Observation write, by file2caom2_augmentation.finish_observation
+            update_catalogue_meta_release(self._observation)
         return self._observation
 
 
+def get_plane_role(observation_id, product_id):
+    """
+    :return: PLANE_ROLE_CATALOGUE for the TILE catalogues (CAT, CUTOUTS_CAT, MORPH_CAT, and any other *_CAT),
+        PLANE_ROLE_SCIENCE for the per-filter Planes, and PLANE_ROLE_AUXILIARY otherwise
+    """
+    product_suffix = product_id[len(observation_id) + 1:]
+    if product_suffix == 'CAT' or product_suffix.endswith('_CAT'):
+        return PLANE_ROLE_CATALOGUE
+    if product_suffix in EUCLID_FILTERS:
+        return PLANE_ROLE_SCIENCE
+    return PLANE_ROLE_AUXILIARY
+
+
+def update_catalogue_meta_release(observation):
+    """
+    The catalogue Planes, without a metaRelease of their own, get the metaRelease of the first other Plane that
+    has one. With tile_batching, this happens once per Observation write, instead of after every file.
+    """
+    roles = {
+        product_id: get_plane_role(observation.observation_id, product_id) for product_id in observation.planes
+    }
+    catalogues = [
+        plane
+        for product_id, plane in observation.planes.items()
+        if roles[product_id] == PLANE_ROLE_CATALOGUE and plane.meta_release is None
+    ]
+    if len(catalogues) == 0:
+        return
+    meta_release = next(
+        (
+            plane.meta_release
+            for product_id, plane in observation.planes.items()
+            if roles[product_id] != PLANE_ROLE_CATALOGUE and plane.meta_release is not None
+        ),
+        None,
+    )
+    if meta_release is not None:
+        for plane in catalogues:
+            plane.meta_release = meta_release
+
+
 class EUCLIDMappingNIR(EUCLIDMappingAuxiliary):
     def __init__(self, clients, config, dest_uri, observation, reporter, storage_name):
         super().__init__(
@@ -256,10 +451,8 @@ class EUCLIDMappingNIR(EUCLIDMappingAuxiliary):
             storage_name,
         )
 
-    def accumulate_blueprint(self, bp):
-        """Configure the telescope-specific ObsBlueprint at the CAOM model Observation level."""
-        self._logger.debug('Begin accumulate_bp.')
-        super().accumulate_blueprint(bp)
+    def _accumulate_template(self, bp):
+        super()._accumulate_template(bp)
         bp.set('Plane.dataProductType', DataProductType.IMAGE)
         bp.clear('Plane.provenance.name')
         bp.add_attribute('Plane.provenance.name', 'SOFTNAME')
@@ -293,7 +486,6 @@ class EUCLIDMappingNIR(EUCLIDMappingAuxiliary):
         bp.set('Chunk.energy.specsys', 'TOPOCENT')
         bp.set('Chunk.energy.ssysobs', 'TOPOCENT')
         bp.set('Chunk.energy.ssyssrc', 'TOPOCENT')
-        self._logger.debug('Done accumulate_bp.')
 
     def _get_artifact_product_type(self):
         result = ProductType.SCIENCE
@@ -307,8 +499,7 @@ class EUCLIDMappingNIR(EUCLIDMappingAuxiliary):
         if not filter_name:
             filter_name = self._storage_name.get_filter_name()
         if filter_name:
-            temp = get_filter_md(filter_name)
-            result = FilterMetadataCache.get_fwhm(temp)
+            ignore_central_wavelength, result = get_filter_energy(filter_name)
         return result
 
     def _get_energy_function_val(self, ext):
@@ -317,8 +508,7 @@ class EUCLIDMappingNIR(EUCLIDMappingAuxiliary):
         if not filter_name:
             filter_name = self._storage_name.get_filter_name()
         if filter_name:
-            temp = get_filter_md(filter_name)
-            result = FilterMetadataCache.get_central_wavelength(temp)
+            result, ignore_fwhm = get_filter_energy(filter_name)
         return result
 
     def _update_artifact(self, artifact):
@@ -333,8 +523,8 @@ class EUCLIDMappingVIS(EUCLIDMappingNIR):
     def __init__(self, clients, config, dest_uri, observation, reporter, storage_name):
         super().__init__(clients, config, dest_uri, observation, reporter, storage_name)
 
-    def accumulate_blueprint(self, bp):
-        super().accumulate_blueprint(bp)
+    def _accumulate_template(self, bp):
+        super()._accumulate_template(bp)
         # from https://www.euclid-ec.org/science/overview/#
         # VIS
         # pixel scale: 0.1 arcsecond
@@ -343,13 +533,35 @@ class EUCLIDMappingVIS(EUCLIDMappingNIR):
         bp.set_default('Chunk.energy.bandpassName', 'VIS')
 
 def get_filter_md(filter_name):
-    filter_md = filter_cache.get_svo_filter(filter_name[0:3], filter_name)
-    if not filter_cache.is_cached(filter_name[0:3], filter_name):
-        # want to stop ingestion if the filter name is not expected
-        raise mc.CadcException(f'Could not find filter metadata for {filter_name}.')
+    # TILE workers share the cache, so one SVO query per filter
+    with filter_cache_lock:
+        filter_md = filter_cache.get_svo_filter(filter_name[0:3], filter_name)
+        if not filter_cache.is_cached(filter_name[0:3], filter_name):
+            # want to stop ingestion if the filter name is not expected
+            raise mc.CadcException(f'Could not find filter metadata for {filter_name}.')
     return filter_md
 
 
+def _retrieve_filter_energy(filter_name):
+    with stage_metrics.timer('svo', filter=filter_name):
+        filter_md = get_filter_md(filter_name)
+    return FilterMetadataCache.get_central_wavelength(filter_md), FilterMetadataCache.get_fwhm(filter_md)
+
+
+def get_filter_energy(filter_name):
+    """
+    :param filter_name: str the filter, as named by the file headers
+    :return: tuple of (central wavelength, FWHM), from the filter_store when there is one, and from SVO otherwise
+    """
+    result = filter_energy_values.get(filter_name)
+    if result is not None:
+        return result
+    with filter_cache_lock:
+        if filter_store is None:
+            return _retrieve_filter_energy(filter_name)
+        return filter_store.get(filter_name, _retrieve_filter_energy)
+
+
 FILTER_REPAIR_LOOKUP = {
     'NIR_Y': 'NISP.Y',
     'NIR_J': 'NISP.J',
@@ -365,3 +577,9 @@ filter_cache = FilterMetadataCache(
     telescope='Euclid',
     cache={},
 )
+filter_cache_lock = RLock()
+# a FilterStore instance, set by the entry points, that persists the SVO values between pipeline invocations
+filter_store = None
+# (central wavelength, FWHM) by filter name, as retrieved by the parent of a mapping process, which has the
+# filter_store
+filter_energy_values = {}
@@ -0,0 +1,166 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Stage-level timers and counters for the Euclid pipeline, written as JSON lines to the observable_directory.
+
+Each line summarizes one stage for one set of labels (tile, product_type, filter) since the previous flush:
+
+{"time": "2026-10-18T12:00:00+00:00", "stage": "header", "labels": {"tile": "TILE102070858", ...},
+ "count": 9, "seconds": 1.234, "max_seconds": 0.5}
+"""
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from threading import Lock
+from time import perf_counter
+
+
+__all__ = ['StageMetrics', 'stage_metrics', 'storage_name_labels']
+
+
+def storage_name_labels(storage_name):
+    """:return: dict of the tile, product_type and filter labels for an EUCLIDName"""
+    parts = storage_name.parts
+    return {'tile': parts.tile, 'product_type': parts.product_type, 'filter': parts.filter_name}
+
+
+class StageMetrics:
+    """
+    Accumulates, by stage and labels, the count, total seconds and longest time of each timed step, and the
+    counts of counted events. Accumulation is thread-safe, and does nothing until a file is opened.
+    """
+
+    def __init__(self):
+        self._fqn = None
+        self._lock = Lock()
+        self._values = {}
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def enabled(self):
+        return self._fqn is not None
+
+    def open(self, fqn):
+        """:param fqn: str the JSON lines file, appended to by each flush. None disables accumulation."""
+        self._fqn = fqn
+        self._values = {}
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        if self._fqn is None:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._add(stage, labels, 1, perf_counter() - start)
+
+    def count(self, stage, value=1, **labels):
+        if self._fqn is not None:
+            self._add(stage, labels, value, 0.0)
+
+    def _add(self, stage, labels, count, seconds):
+        key = (stage, tuple(sorted(labels.items())))
+        with self._lock:
+            entry = self._values.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def flush(self):
+        """Appends one line per stage and labels to the file, and starts accumulating again."""
+        if self._fqn is None:
+            return
+        with self._lock:
+            values = self._values
+            self._values = {}
+        if not values:
+            return
+        now = datetime.now(tz=timezone.utc).isoformat()
+        os.makedirs(os.path.dirname(self._fqn), exist_ok=True)
+        with open(self._fqn, 'a') as f:
+            for (stage, labels), (count, seconds, max_seconds) in values.items():
+                line = {
+                    'time': now,
+                    'stage': stage,
+                    'labels': dict(labels),
+                    'count': count,
+                    'seconds': round(seconds, 6),
+                    'max_seconds': round(max_seconds, 6),
+                }
+                f.write(f'{json.dumps(line)}\n')
+        self._logger.debug(f'Wrote {len(values)} stage metrics to {self._fqn}.')
+
+
+# the pipeline-wide instance, opened by composable when observe_execution is True
+stage_metrics = StageMetrics()
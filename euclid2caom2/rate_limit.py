@@ -0,0 +1,270 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+"""
+Client-side rate limits for the CADC services the pipeline calls: 'data' (storage_inventory_resource_id),
+'metadata' (resource_id) and 'inventory' (storage_inventory_tap_resource_id).
+
+Each service has a token bucket, whose rate adapts with AIMD (additive increase, multiplicative decrease) to the
+latency and throttling of the calls. A call waits for its token, so when a service slows down, the work waiting on
+it slows down too, instead of failing. A call rejected because the service is overloaded (HTTP 429 or 503) is
+repeated, at the reduced rate, instead of failing the file. A write is repeated only after an HTTP 429, which
+guarantees the write was not applied, because a 503 may come from a proxy after the service has applied it.
+"""
+
+import logging
+import re
+from threading import Lock
+from time import monotonic, sleep
+
+from euclid2caom2.metrics import stage_metrics
+
+
+__all__ = ['AIMDRateLimiter', 'is_rejected', 'is_throttled', 'is_transient', 'ServiceLimits', 'service_limits']
+
+
+# an HTTP status that says the service is overloaded, rather than that the call is wrong
+THROTTLED_PATTERN = re.compile(r'\b(429|503)\b|Too Many Requests|Service Unavailable|Service Temporarily Unavailable')
+# an HTTP status that says the service turned the call away before acting on it
+REJECTED_PATTERN = re.compile(r'\b429\b|Too Many Requests')
+# an HTTP status that says the service failed, rather than that the call is wrong
+SERVER_ERROR_PATTERN = re.compile(r'\b5\d\d Server Error\b')
+
+
+def _has_status(e, status_codes, pattern):
+    while e is not None:
+        status_code = getattr(getattr(e, 'response', None), 'status_code', None)
+        if status_code in status_codes or pattern.search(str(e)):
+            return True
+        e = e.__cause__ or e.__context__
+    return False
+
+
+def is_throttled(e):
+    """
+    :param e: Exception from a service call, which may wrap the HTTP error as its cause
+    :return: True if the service rejected the call because it is overloaded
+    """
+    return _has_status(e, (429, 503), THROTTLED_PATTERN)
+
+
+def is_transient(e):
+    """
+    :param e: Exception from a service call, which may wrap the cause
+    :return: True if the call may succeed when repeated - a connection failure, a timeout, throttling, or an HTTP
+        5xx - rather than fail the same way, like a missing file or a header that cannot be parsed
+    """
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+    if is_throttled(e):
+        return True
+    while e is not None:
+        if isinstance(e, (ConnectionError, TimeoutError, RequestsConnectionError, Timeout)):
+            return True
+        status_code = getattr(getattr(e, 'response', None), 'status_code', None)
+        if (status_code is not None and status_code >= 500) or SERVER_ERROR_PATTERN.search(str(e)):
+            return True
+        e = e.__cause__ or e.__context__
+    return False
+
+
+def is_rejected(e):
+    """
+    :param e: Exception from a service call, which may wrap the HTTP error as its cause
+    :return: True if the service turned the call away before acting on it, so that even a write is safe to repeat
+    """
+    return _has_status(e, (429,), REJECTED_PATTERN)
+
+
+class AIMDRateLimiter:
+    """
+    A token bucket, holding at most one second of tokens, with a refill rate, in calls per second, between
+    min_rate and max_rate.
+
+    - a call answered within max_latency_s adds increase / rate to the rate, so the rate grows by about
+      increase calls per second, each second
+    - a call that is throttled, or takes longer than max_latency_s, multiplies the rate by decrease, at most once
+      per max_latency_s, so that the calls already in flight when a service slows down count as one signal
+
+    Other errors, like a missing file or a bad request, say nothing about the load on the service, so only their
+    latency counts.
+    """
+
+    def __init__(self, name, rate, min_rate, max_rate, max_latency_s=5.0, increase=1.0, decrease=0.5):
+        self.name = name
+        self.rate = rate
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._max_latency_s = max_latency_s
+        self._increase = increase
+        self._decrease = decrease
+        self._tokens = 1.0
+        self._refilled_at = monotonic()
+        self._decreased_at = None
+        self._lock = Lock()
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def acquire(self):
+        """
+        Reserves the next token, and waits until it is due.
+
+        :return: float seconds waited
+        """
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            self._tokens -= 1.0
+            wait_s = 0.0 if self._tokens >= 0.0 else -self._tokens / self.rate
+        if wait_s > 0.0:
+            sleep(wait_s)
+        return wait_s
+
+    def record(self, seconds, throttled):
+        """
+        :param seconds: float duration of the call
+        :param throttled: bool True if the service rejected the call because it is overloaded
+        """
+        with self._lock:
+            if throttled or seconds > self._max_latency_s:
+                now = monotonic()
+                if self._decreased_at is None or now - self._decreased_at > self._max_latency_s:
+                    self._decreased_at = now
+                    self.rate = max(self._min_rate, self.rate * self._decrease)
+                    self._logger.info(f'{self.name} rate decreased to {self.rate:.2f}/s.')
+            else:
+                self.rate = min(self._max_rate, self.rate + self._increase / self.rate)
+
+
+class ServiceLimits:
+    """
+    The AIMDRateLimiter for each service. Calls to a service without a limiter are made immediately.
+    """
+
+    # the bounds of each rate, relative to the configured rate
+    MIN_RATE_FACTOR = 1 / 16
+    MAX_RATE_FACTOR = 4
+
+    def __init__(self):
+        self._limiters = {}
+        self._retries = 0
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def open(self, rates, max_latency_s=5.0, retries=10):
+        """
+        :param rates: dict of the starting calls per second, by service name
+        :param max_latency_s: float the call duration above which a service is treated as slowing down
+        :param retries: int the number of times a throttled call is repeated before it fails
+        """
+        self._limiters = {
+            service: AIMDRateLimiter(
+                service,
+                rate,
+                rate * ServiceLimits.MIN_RATE_FACTOR,
+                rate * ServiceLimits.MAX_RATE_FACTOR,
+                max_latency_s,
+            )
+            for service, rate in rates.items()
+        }
+        self._retries = retries
+
+    def get(self, service):
+        """:return: AIMDRateLimiter, or None if the service is not limited"""
+        return self._limiters.get(service)
+
+    def call(self, service, fn, *args, write=False, **kwargs):
+        """
+        :param service: str 'data', 'metadata' or 'inventory'
+        :param fn: the blocking call
+        :param write: bool True for calls that change the service, which are repeated only when is_rejected
+        :return: the result of fn(*args, **kwargs)
+        """
+        may_repeat = is_rejected if write else is_throttled
+        limiter = self._limiters.get(service)
+        if limiter is None:
+            return fn(*args, **kwargs)
+        for attempt in range(self._retries + 1):
+            wait_s = limiter.acquire()
+            if wait_s > 0.0:
+                stage_metrics.count('rate_limit_wait', service=service)
+            start = monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttled(e)
+                limiter.record(monotonic() - start, throttled=throttled)
+                if attempt == self._retries or not may_repeat(e):
+                    raise
+                stage_metrics.count('throttled', service=service)
+                self._logger.warning(f'{service} throttled with {e}. Retry at {limiter.rate:.2f}/s.')
+                continue
+            limiter.record(monotonic() - start, throttled=False)
+            return result
+
+
+# the pipeline-wide instance, opened by composable from the rate_limits config.yml value
+service_limits = ServiceLimits()
@@ -67,7 +67,8 @@
 #
 
 from os.path import dirname, join, realpath
-from caom2pipe.manage_composable import Config, StorageName, TaskType
+from caom2pipe.manage_composable import StorageName, TaskType
+from euclid2caom2.config import EUCLIDConfig
 import pytest
 
 COLLECTION = 'EUCLID'
@@ -77,7 +78,7 @@ PREVIEW_SCHEME = 'esa'
 
 @pytest.fixture()
 def test_config():
-    config = Config()
+    config = EUCLIDConfig()
     config.collection = COLLECTION
     config.preview_scheme = PREVIEW_SCHEME
     config.scheme = SCHEME
@@ -66,10 +66,33 @@
 # ***********************************************************************
 #
 
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import yaml
+from astropy.table import Table
 from mock import patch
 
 from caom2pipe import manage_composable as mc
 from euclid2caom2 import composable
+from euclid2caom2.tile_index import TileIndex
+
+
+# not imported with the entry point module
+DEFERRED_MODULES = [
+    'astropy',
+    'caom2pipe.astro_composable',
+    'caom2pipe.client_composable',
+    'caom2pipe.manage_composable',
+    'caom2pipe.run_composable',
+    'caom2utils',
+    'euclid2caom2.config',
+    'euclid2caom2.data_source',
+    'euclid2caom2.file2caom2_augmentation',
+    'euclid2caom2.main_app',
+    'euclid2caom2.tile_execute',
+]
 
 
 @patch('caom2pipe.client_composable.ClientCollection')
@@ -100,3 +123,129 @@ def test_run(do_one_mock, clients_mock, test_config, tmp_path, change_test_dir):
     assert isinstance(test_storage, mc.StorageName), type(test_storage)
     assert test_storage.file_name == test_f_name, 'wrong file name'
     assert test_storage.source_names[0] == test_f_name, 'wrong fname on disk'
+
+
+@patch('euclid2caom2.tile_execute.EUCLIDClientCollection')
+@patch('euclid2caom2.tile_execute.TileRunner.run')
+def test_run_tile_batching(run_mock, clients_mock, test_config, tmp_path, change_test_dir):
+    run_mock.return_value = 0
+    test_f_names = [
+        'EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        'EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits',
+    ]
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.proxy_file_name = 'test_proxy.fqn'
+    test_config.write_to_file(test_config)
+    with open(f'{tmp_path}/config.yml', 'a') as f:
+        f.write('tile_batching: True\n')
+
+    with open(test_config.proxy_fqn, 'w') as f:
+        f.write('test content')
+    with open(test_config.work_fqn, 'w') as f:
+        f.write('\n'.join(test_f_names))
+
+    test_result = composable._run()
+    assert test_result == 0, 'wrong return value'
+    assert run_mock.called, 'should have been called'
+    args, kwargs = run_mock.call_args
+    assert [entry.file_name for entry in args[0]] == test_f_names, 'wrong work'
+
+
+def test_import_time():
+    # a fresh interpreter, so the modules imported by the other tests do not count
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import euclid2caom2.composable'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # import time: self [us] | cumulative | imported package
+    imported = [line.split('|')[-1].strip() for line in result.stderr.splitlines()[1:]]
+    assert 'euclid2caom2.composable' in imported, 'entry point'
+    for module_name in DEFERRED_MODULES:
+        assert module_name not in imported, f'{module_name} imported at startup'
+
+
+@patch('euclid2caom2.incremental.save_bookmark')
+@patch('euclid2caom2.incremental.has_work')
+@patch('caom2pipe.manage_composable.State')
+def test_is_idle_held_tiles(state_mock, has_work_mock, save_mock, test_config, tmp_path):
+    state_mock.return_value.get_bookmark.return_value = datetime(2026, 10, 18)
+    has_work_mock.return_value = False
+    test_config.tile_batching = True
+    test_config.incomplete_tile_timeout = 24
+    test_fqn = f'{tmp_path}/tile_index.yml'
+    test_first_seen = datetime.now(tz=timezone.utc) - timedelta(hours=2)
+    with open(test_fqn, 'w') as f:
+        yaml.safe_dump(
+            {
+                'version': TileIndex.VERSION,
+                'tiles': {'TILE102165193': {'first_seen': test_first_seen.isoformat(), 'products': {}}},
+            },
+            f,
+        )
+
+    # a held TILE that has not timed out only becomes ready with new files
+    assert composable._is_idle(test_config, test_fqn), 'idle'
+    assert has_work_mock.call_count == 1, 'probe'
+    assert save_mock.called, 'bookmark moved'
+
+    test_config.incomplete_tile_timeout = 1
+    assert not composable._is_idle(test_config, test_fqn), 'a timed-out TILE is ready'
+    assert has_work_mock.call_count == 1, 'no probe'
+
+
+@patch('cadcutils.net.Subject')
+@patch('cadctap.CadcTapClient')
+@patch('euclid2caom2.data_source.CadcTapClient')
+@patch('caom2pipe.client_composable.define_subject')
+@patch('caom2pipe.client_composable.query_tap_client')
+@patch('caom2pipe.manage_composable.State')
+@patch('euclid2caom2.tile_execute.run_by_state_tile')
+def test_run_incremental_idle(
+    run_mock,
+    state_mock,
+    query_mock,
+    subject_mock,
+    tap_client_mock,
+    probe_client_mock,
+    probe_subject_mock,
+    test_config,
+    tmp_path,
+    change_test_dir,
+):
+    test_start = datetime.now(tz=timezone.utc).replace(tzinfo=None) - timedelta(minutes=90)
+    state_mock.return_value.get_bookmark.return_value = test_start
+    probe_rows = []
+
+    def _probe_mock(query, output_file, **kwargs):
+        assert 'SELECT TOP 1 ' in query, 'single row'
+        output_file.write(''.join(probe_rows))
+
+    probe_client_mock.return_value.query.side_effect = _probe_mock
+    query_mock.return_value = Table(
+        rows=[('esa:EUCLID/EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits', '')],
+        names=['uri', 'lastModified'],
+    )
+    run_mock.return_value = 0
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.proxy_file_name = 'test_proxy.fqn'
+    test_config.write_to_file(test_config)
+    with open(f'{tmp_path}/config.yml', 'a') as f:
+        f.write('tile_batching: True\n')
+    with open(test_config.proxy_fqn, 'w') as f:
+        f.write('test content')
+    with open(test_config.state_fqn, 'w') as f:
+        f.write('bookmarks: {}\n')
+
+    assert composable._run_incremental() == 0, 'wrong result'
+    assert probe_client_mock.return_value.query.call_count == 1, 'one probe'
+    assert not tap_client_mock.called, 'no data source for an empty window'
+    assert not run_mock.called, 'no execution for an empty window'
+    args, kwargs = state_mock.return_value.save_state.call_args
+    assert args[0] == composable.EUCLID_BOOKMARK, 'bookmark'
+    assert args[1] > test_start, 'bookmark moved to the end of the window'
+
+    probe_rows.append('esa:EUCLID/EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits,\n')
+    assert composable._run_incremental() == 0, 'wrong result'
+    assert run_mock.called, 'execution for a window with work'
@@ -0,0 +1,129 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+from astropy.table import Table
+from datetime import datetime, timedelta
+from mock import patch
+
+from euclid2caom2.data_source import EUCLIDInventoryDataSource
+
+
+TEST_ROWS = [
+    (
+        'esa:EUCLID/EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        '2024-11-05T13:00:00.000',
+    ),
+    (
+        'esa:EUCLID/EUC_MER_BGSUB-MOSAIC-NIR-Y_TILE102165193-683034_20240526T184144.400003Z_00.00.fits',
+        '2024-11-05T13:01:00.000',
+    ),
+    (
+        'esa:EUCLID/EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits',
+        '2024-11-05T13:02:00.000',
+    ),
+]
+
+
+@patch('euclid2caom2.data_source.CadcTapClient')
+@patch('caom2pipe.client_composable.define_subject')
+@patch('caom2pipe.client_composable.query_tap_client')
+def test_get_time_box_work(query_mock, subject_mock, tap_client_mock, test_config):
+    test_config.interval = 60
+
+    def _query_mock(query, ignore_client):
+        # pages of two rows
+        offset = 0 if 'A.uri >' not in query else 2
+        rows = TEST_ROWS[offset:offset + 2]
+        return Table(rows=rows, names=['uri', 'lastModified']) if rows else Table(names=['uri', 'lastModified'])
+
+    query_mock.side_effect = _query_mock
+    test_subject = EUCLIDInventoryDataSource(test_config, page_size=2, max_files=4)
+    test_result = test_subject.get_time_box_work(datetime(2024, 11, 5, 12), datetime(2024, 11, 5, 14))
+    assert query_mock.call_count == 2, 'keyset pages'
+    args, kwargs = query_mock.call_args_list[1]
+    assert "A.lastModified = '2024-11-05T13:01:00.000' AND A.uri > 'esa:EUCLID/EUC_MER_BGSUB" in args[0], 'keyset'
+    assert "A.uri LIKE 'esa:EUCLID/EUC_MER_%'" in args[0], 'MER only'
+    assert [entry.entry_name for entry in test_result] == [TEST_ROWS[0][0], TEST_ROWS[2][0], TEST_ROWS[1][0]], (
+        'tile-complete order'
+    )
+    assert test_result[0].entry_dt == test_result[1].entry_dt == datetime(2024, 11, 5, 13, 2), 'tile time'
+    assert test_subject.interval == timedelta(minutes=60), 'interval unchanged'
+
+    query_mock.side_effect = lambda query, client: Table(names=['uri', 'lastModified'])
+    test_subject.get_time_box_work(datetime(2024, 11, 5, 14), datetime(2024, 11, 5, 15))
+    assert test_subject.interval == timedelta(minutes=120), 'quiet interval grows'
+
+    # a name that does not follow the naming rules does not stop the time-box
+    def _bad_name_query_mock(query, ignore_client):
+        if 'A.uri >' in query:
+            return Table(names=['uri', 'lastModified'])
+        rows = [('esa:EUCLID/EUC_MER_README.txt', '2024-11-05T15:01:00.000'), TEST_ROWS[0]]
+        return Table(rows=rows, names=['uri', 'lastModified'])
+
+    query_mock.side_effect = _bad_name_query_mock
+    test_result = test_subject.get_time_box_work(datetime(2024, 11, 5, 15), datetime(2024, 11, 5, 16))
+    assert [entry.entry_name for entry in test_result] == [TEST_ROWS[0][0]], 'unexpected name skipped'
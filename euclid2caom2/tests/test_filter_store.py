@@ -0,0 +1,140 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+from datetime import timedelta
+from mock import Mock
+
+from euclid2caom2.filter_store import FilterStore
+
+import pytest
+import yaml
+
+
+def test_filter_store_write_through(tmp_path):
+    test_fqn = f'{tmp_path}/svo_filters.yml'
+    retrieve_mock = Mock(return_value=(7310.7619211456, 3784.4194576686))
+    test_subject = FilterStore(test_fqn)
+    assert test_subject.get('VIS', retrieve_mock) == (7310.7619211456, 3784.4194576686), 'first value'
+    assert test_subject.get('VIS', retrieve_mock) == (7310.7619211456, 3784.4194576686), 'cached value'
+    assert retrieve_mock.call_count == 1, 'one retrieval'
+
+    # a second invocation, or a second process, does not retrieve again
+    second_subject = FilterStore(test_fqn)
+    assert second_subject.get('VIS', retrieve_mock) == (7310.7619211456, 3784.4194576686), 'persisted value'
+    assert retrieve_mock.call_count == 1, 'still one retrieval'
+
+    with open(test_fqn) as f:
+        content = yaml.safe_load(f)
+    assert content['version'] == FilterStore.VERSION, 'version'
+    assert list(content['filters'].keys()) == ['VIS'], 'filters'
+
+
+def test_filter_store_concurrent_writers(tmp_path):
+    test_fqn = f'{tmp_path}/svo_filters.yml'
+    first_subject = FilterStore(test_fqn)
+    second_subject = FilterStore(test_fqn)
+    first_subject.get('VIS', Mock(return_value=(1.0, 2.0)))
+    second_subject.get('NIR_Y', Mock(return_value=(3.0, 4.0)))
+    retrieve_mock = Mock()
+    third_subject = FilterStore(test_fqn)
+    assert third_subject.get('VIS', retrieve_mock) == (1.0, 2.0), 'first writer entry'
+    assert third_subject.get('NIR_Y', retrieve_mock) == (3.0, 4.0), 'second writer entry'
+    assert not retrieve_mock.called, 'no retrieval'
+
+    # a refresh by another process is not replaced by the older entry held in memory
+    FilterStore(test_fqn, max_age=timedelta(seconds=-1)).get('VIS', Mock(return_value=(5.0, 6.0)))
+    first_subject.get('NIR_H', Mock(return_value=(7.0, 8.0)))
+    fourth_subject = FilterStore(test_fqn)
+    assert fourth_subject.get('VIS', retrieve_mock) == (5.0, 6.0), 'newer entry kept'
+    assert fourth_subject.get('NIR_H', retrieve_mock) == (7.0, 8.0), 'new entry'
+    assert first_subject.get('VIS', retrieve_mock) == (5.0, 6.0), 'writer sees the newer entry'
+
+
+def test_filter_store_expiry(tmp_path):
+    test_fqn = f'{tmp_path}/svo_filters.yml'
+    FilterStore(test_fqn).get('VIS', Mock(return_value=(1.0, 2.0)))
+
+    test_subject = FilterStore(test_fqn, max_age=timedelta(seconds=-1))
+    assert test_subject.get('VIS', Mock(return_value=(5.0, 6.0))) == (5.0, 6.0), 'refreshed value'
+
+    # an unavailable SVO falls back to the expired value
+    test_subject = FilterStore(test_fqn, max_age=timedelta(seconds=-1))
+    assert test_subject.get('VIS', Mock(side_effect=ConnectionError('svo down'))) == (5.0, 6.0), 'expired value'
+
+    # with no value at all, the failure is not hidden
+    with pytest.raises(ConnectionError):
+        test_subject.get('NIR_H', Mock(side_effect=ConnectionError('svo down')))
+
+
+def test_filter_store_version(tmp_path):
+    test_fqn = f'{tmp_path}/svo_filters.yml'
+    with open(test_fqn, 'w') as f:
+        yaml.safe_dump({'version': FilterStore.VERSION + 1, 'filters': {'VIS': {'central_wavelength': 0.0}}}, f)
+    retrieve_mock = Mock(return_value=(1.0, 2.0))
+    assert FilterStore(test_fqn).get('VIS', retrieve_mock) == (1.0, 2.0), 'other versions ignored'
+    assert retrieve_mock.called, 'retrieved'
@@ -0,0 +1,157 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import numpy as np
+
+from astropy.wcs import WCS
+from caom2 import ObservationReader, ProductType
+from caom2utils.polygonvalidator import validate_polygon
+from euclid2caom2 import footprint
+
+
+def _expected_points(chunk, samples):
+    # the astropy transform, one pixel at a time
+    function = chunk.position.axis.function
+    wcs = WCS(naxis=2)
+    wcs.wcs.ctype = [chunk.position.axis.axis1.ctype, chunk.position.axis.axis2.ctype]
+    wcs.wcs.crpix = [function.ref_coord.coord1.pix, function.ref_coord.coord2.pix]
+    wcs.wcs.crval = [function.ref_coord.coord1.val, function.ref_coord.coord2.val]
+    wcs.wcs.cd = [[function.cd11, function.cd12], [function.cd21, function.cd22]]
+    x, y = footprint._edge_pixels(function.dimension.naxis1, function.dimension.naxis2, samples)
+    return np.array([wcs.all_pix2world([[pixel_x, pixel_y]], 1)[0] for pixel_x, pixel_y in zip(x, y)])
+
+
+def test_observation_footprints(test_data_dir):
+    observation = ObservationReader().read(f'{test_data_dir}/tile1/tile1.expected.xml')
+    test_result = footprint.observation_footprints(observation)
+    chunks = {}
+    for plane in observation.planes.values():
+        for artifact in plane.artifacts.values():
+            for part in artifact.parts.values():
+                for chunk in part.chunks:
+                    if chunk.position is not None and chunk.position.axis.function is not None:
+                        chunks.setdefault(artifact.uri, []).append(chunk)
+    assert len(test_result) > 0, 'mosaics'
+    assert test_result.keys() == chunks.keys(), 'artifacts with a spatial WCS'
+    for uri, polygons in test_result.items():
+        for chunk, polygon in zip(chunks[uri], polygons):
+            validate_polygon(polygon)
+            assert len(polygon.points) == 4 * (footprint.EDGE_SAMPLES - 1), 'edge samples'
+            assert len(polygon.samples.vertices) == len(polygon.points) + 1, 'closed'
+            expected = _expected_points(chunk, footprint.EDGE_SAMPLES)
+            test_points = np.array([[point.cval1, point.cval2] for point in polygon.points])
+            if not np.allclose(test_points[0], expected[0]):
+                # the winding direction is reversed on the sky
+                test_points = test_points[::-1]
+            assert np.abs(test_points - expected).max() < 1e-9, f'precision {uri}'
+
+
+def _corners(chunk):
+    # the outer pixel corners, transformed by astropy, independently of footprint
+    function = chunk.position.axis.function
+    wcs = WCS(naxis=2)
+    wcs.wcs.ctype = [chunk.position.axis.axis1.ctype, chunk.position.axis.axis2.ctype]
+    wcs.wcs.crpix = [function.ref_coord.coord1.pix, function.ref_coord.coord2.pix]
+    wcs.wcs.crval = [function.ref_coord.coord1.val, function.ref_coord.coord2.val]
+    wcs.wcs.cd = [[function.cd11, function.cd12], [function.cd21, function.cd22]]
+    naxis1 = function.dimension.naxis1
+    naxis2 = function.dimension.naxis2
+    pixels = [[0.5, 0.5], [naxis1 + 0.5, 0.5], [naxis1 + 0.5, naxis2 + 0.5], [0.5, naxis2 + 0.5]]
+    return wcs.all_pix2world(pixels, 1)
+
+
+def test_update_plane_positions(test_data_dir):
+    # the corners of each Plane footprint are within 1e-9 degrees of the astropy corners of its science chunk
+    precision_deg = 1e-9
+    observation = ObservationReader().read(f'{test_data_dir}/tile1/tile1.expected.xml')
+    science_chunks = {}
+    for product_id, plane in observation.planes.items():
+        assert plane.position is None, f'no position in the input {product_id}'
+        for artifact in plane.artifacts.values():
+            if artifact.product_type == ProductType.SCIENCE:
+                for part in artifact.parts.values():
+                    for chunk in part.chunks:
+                        if chunk.position is not None and chunk.position.axis.function is not None:
+                            science_chunks.setdefault(product_id, chunk)
+    assert len(science_chunks) > 0, 'mosaics'
+
+    footprint.update_plane_positions(observation)
+    for product_id, plane in observation.planes.items():
+        if product_id not in science_chunks:
+            continue
+        validate_polygon(plane.position.bounds)
+        test_points = np.array([[point.cval1, point.cval2] for point in plane.position.bounds.points])
+        for corner in _corners(science_chunks[product_id]):
+            distance = np.abs(test_points - corner).max(axis=1).min()
+            assert distance < precision_deg, f'{product_id} corner {corner}'
+
+    # a position from the repository is kept
+    product_id = next(iter(science_chunks))
+    test_position = observation.planes[product_id].position
+    footprint.update_plane_positions(observation)
+    assert observation.planes[product_id].position is test_position, 'existing position'
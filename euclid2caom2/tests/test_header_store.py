@@ -0,0 +1,113 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+from cadcdata import FileInfo
+from caom2utils.data_util import get_local_file_headers
+from caom2pipe import manage_composable as mc
+from euclid2caom2.header_store import HeaderStore
+
+import glob
+import pytest
+
+
+def test_header_store(test_data_dir, tmp_path):
+    test_subject = HeaderStore(tmp_path.as_posix())
+    test_uri = 'esa:EUCLID/test.fits'
+    for fqn in glob.glob(f'{test_data_dir}/tile1/*.fits.header'):
+        test_headers = get_local_file_headers(fqn)
+        test_subject.put(test_uri, fqn, test_headers)
+        test_result = test_subject.get(test_uri, fqn)
+        assert len(test_result) == len(test_headers), 'hdu count'
+        for expected, actual in zip(test_headers, test_result):
+            assert list(expected.keys()) == list(actual.keys()), f'keywords {fqn}'
+            for expected_card, actual_card in zip(expected.cards, actual.cards):
+                assert type(expected_card.value) is type(actual_card.value), f'{expected_card} {actual_card}'
+                assert str(expected_card.value) == str(actual_card.value), f'{expected_card} {actual_card}'
+    assert test_subject.get(test_uri, 'other checksum') is None, 'content addressed'
+
+    test_headers = get_local_file_headers(f'{test_data_dir}/tile1/{_BGSUB}.header')
+    test_subject.put(test_uri, 'primary', test_headers, 1)
+    assert len(test_subject.get(test_uri, 'primary', 1)) == 1, 'primary hdu'
+    assert test_subject.get(test_uri, 'primary') is None, 'not all the hdus'
+    # fewer HDUs than requested means all of them
+    test_subject.put(test_uri, 'all', test_headers, 2)
+    assert len(test_subject.get(test_uri, 'all')) == 1, 'all the hdus'
+
+
+def test_header_store_file_info(tmp_path):
+    test_subject = HeaderStore(tmp_path.as_posix())
+    test_uri = 'esa:EUCLID/test.fits'
+    with pytest.raises(mc.CadcException):
+        test_subject.get_file_info(test_uri)
+    test_subject.put_file_info(test_uri, FileInfo(test_uri, size=42, md5sum='abc', file_type='application/fits'))
+    test_result = test_subject.get_file_info(test_uri)
+    assert test_result.size == 42, 'size'
+    assert test_result.md5sum == 'abc', 'md5sum'
+    assert test_result.file_type == 'application/fits', 'file type'
+
+
+_BGSUB = 'EUC_MER_BGSUB-MOSAIC-VIS_TILE102070858-5ED2D5_20241105T125727.727353Z_00.00.fits'
@@ -0,0 +1,131 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+from mock import Mock
+
+from cadcutils import exceptions
+from caom2utils import data_util
+from euclid2caom2 import headers
+
+import pytest
+
+
+_CATALOGUE_URI = 'esa:EUCLID/EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits'
+
+
+def test_truncate_header_text(test_data_dir):
+    with open(f'{test_data_dir}/tile1/{_CATALOGUE_URI.split("/")[-1]}.header') as f:
+        test_text = f.read()
+    test_result = headers.truncate_header_text(test_text, 1)
+    assert test_result.split('\n')[-1].strip() == 'END', 'ends with the first END card'
+    assert len(test_result.split('\n')) == 5, 'primary cards only'
+    assert headers.truncate_header_text(test_text, 5) == test_text, 'fewer hdus than asked for'
+
+
+def test_header_client(test_data_dir):
+    test_fqn = f'{test_data_dir}/tile1/{_CATALOGUE_URI.split("/")[-1]}.header'
+
+    def _cadcget_mock(uri, dest, fhead):
+        assert fhead, 'headers only'
+        with open(test_fqn, 'rb') as f:
+            dest.write(f.read())
+
+    cadc_client_mock = Mock()
+    cadc_client_mock.cadcget.side_effect = _cadcget_mock
+    metrics_mock = Mock()
+    test_subject = headers.HeaderClient(cadc_client_mock, metrics_mock)
+    test_result = test_subject.get_head(_CATALOGUE_URI, 1)
+    assert len(test_result) == 1, 'primary header'
+    assert test_result[0].get('EXTEND'), 'primary content'
+    assert metrics_mock.observe.called, 'metrics'
+    expected = data_util.get_local_file_headers(test_fqn)
+    assert len(test_subject.get_head(_CATALOGUE_URI)) == len(expected), 'all hdus'
+
+    cadc_client_mock.cadcget.side_effect = Exception('Read timed out')
+    with pytest.raises(exceptions.UnexpectedException, match=f'Did not retrieve {_CATALOGUE_URI} header'):
+        test_subject.get_compact_head(_CATALOGUE_URI, {'DATE'}, 1)
+    assert metrics_mock.observe_failure.called, 'failure metrics'
+
+
+def test_parse_compact_headers(test_data_dir):
+    test_fqn = (
+        f'{test_data_dir}/tile1/EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits.header'
+    )
+    with open(test_fqn) as f:
+        test_text = f.read()
+    expected = data_util.make_headers_from_string(test_text)
+    test_keywords = {'DATE', 'FILTER', 'SOFTINST', 'PPOID', 'CRVAL1', 'NAXIS', 'SIMPLE', 'NOT_THERE'}
+    test_result = headers.parse_compact_headers(test_text, test_keywords)
+    assert len(test_result) == len(expected), 'hdu count'
+    assert set(test_result[0].keys()) == test_keywords & set(expected[0].keys()), 'only the keywords asked for'
+    for keyword, value in test_result[0].items():
+        assert value == expected[0][keyword], keyword
+        assert type(value) is type(expected[0][keyword]), keyword
+    assert test_result[0]['PPOID'].endswith('-123239-3'), 'CONTINUE cards'
+    assert test_result[0].get('NOT_THERE') is None, 'missing keyword'
+    assert len(headers.parse_compact_headers(test_text, test_keywords, 1)) == 1, 'hdu_count'
@@ -0,0 +1,154 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+from copy import copy
+from datetime import datetime
+from mock import Mock, patch
+
+from caom2 import Algorithm, DerivedObservation, Plane, ProductType
+from caom2utils.blueprints import ObsBlueprint
+from euclid2caom2 import main_app
+
+
+def _accumulate(test_config, f_name):
+    storage_name = main_app.EUCLIDName([f'esa:EUCLID/{f_name}'])
+    uri = storage_name.destination_uris[0]
+    storage_name.metadata[uri] = []
+    test_subject = main_app.EUCLIDMappingVIS(Mock(), test_config, uri, None, Mock(), storage_name)
+    bp = ObsBlueprint(instantiated_class=test_subject)
+    test_subject.accumulate_blueprint(bp)
+    return test_subject, bp
+
+
+@patch.object(main_app.EUCLIDMappingAuxiliary, '_blueprint_templates', {})
+def test_blueprint_template(test_config):
+    first_mapping, first_bp = _accumulate(
+        test_config, 'EUC_MER_BGSUB-MOSAIC-VIS_TILE102070858-5ED2D5_20241105T125727.727353Z_00.00.fits'
+    )
+    assert len(main_app.EUCLIDMappingAuxiliary._blueprint_templates) == 1, 'template created'
+
+    with patch.object(main_app.EUCLIDMappingVIS, '_accumulate_template') as accumulate_mock:
+        second_mapping, second_bp = _accumulate(
+            test_config, 'EUC_MER_BGSUB-MOSAIC-VIS_TILE102165193-683034_20240526T184144.400003Z_00.00.fits'
+        )
+        assert not accumulate_mock.called, 'template re-used'
+    assert second_bp._module_instance is second_mapping, 'per-file function lookup'
+    assert first_bp._module_instance is first_mapping, 'template does not change the first blueprint'
+    assert second_bp._get('Observation.target.name') == 'TILE102165193', 'per-file target'
+    assert first_bp._get('Observation.target.name') == 'TILE102070858', 'first target'
+    assert second_bp._get('Artifact.productType') == ProductType.SCIENCE, 'science'
+    for key in first_bp._plan:
+        if key != 'Observation.target.name':
+            assert first_bp._plan[key] == second_bp._plan[key], f'template value {key}'
+
+    second_bp.add_attribute('Observation.metaRelease', 'XDATE')
+    third_mapping, third_bp = _accumulate(
+        test_config, 'EUC_MER_BGSUB-MOSAIC-VIS_TILE102070858-5ED2D5_20241105T125727.727353Z_00.00.fits'
+    )
+    assert 'XDATE' not in third_bp._get('Observation.metaRelease')[0], 'copies are independent'
+
+    # different EUCLIDName traits get a different template
+    weight_mapping, weight_bp = _accumulate(
+        test_config, 'EUC_MER_MOSAIC-VIS-RMS_TILE102070858-BB87CE_20241104T161703.183124Z_00.00.fits'
+    )
+    assert len(main_app.EUCLIDMappingAuxiliary._blueprint_templates) == 2, 'weight template'
+    assert weight_bp._get('Artifact.productType') == ProductType.WEIGHT, 'weight'
+
+    # a Config with the same values, as unpickled in a mapping process, re-uses the template
+    with patch.object(main_app.EUCLIDMappingVIS, '_accumulate_template') as accumulate_mock:
+        _accumulate(
+            copy(test_config), 'EUC_MER_BGSUB-MOSAIC-VIS_TILE102165193-683034_20240526T184144.400003Z_00.00.fits'
+        )
+        assert not accumulate_mock.called, 'template re-used for the same Config values'
+
+    other_config = copy(test_config)
+    other_config.collection = 'OTHER'
+    with patch.object(main_app, 'BLUEPRINT_TEMPLATE_LIMIT', 2):
+        _accumulate(other_config, 'EUC_MER_BGSUB-MOSAIC-VIS_TILE102070858-5ED2D5_20241105T125727.727353Z_00.00.fits')
+    assert len(main_app.EUCLIDMappingAuxiliary._blueprint_templates) == 2, 'limited'
+    assert main_app._get_config_key(other_config) in [
+        key[2] for key in main_app.EUCLIDMappingAuxiliary._blueprint_templates
+    ], 'newest kept'
+
+
+def test_update_catalogue_meta_release():
+    assert main_app.get_plane_role('TILE1', 'TILE1_VIS') == main_app.PLANE_ROLE_SCIENCE, 'filter'
+    assert main_app.get_plane_role('TILE1', 'TILE1_Y') == main_app.PLANE_ROLE_SCIENCE, 'NIR filter'
+    assert main_app.get_plane_role('TILE1', 'TILE1_PSF') == main_app.PLANE_ROLE_AUXILIARY, 'other'
+    test_observation = DerivedObservation('EUCLID', 'TILE1', Algorithm('OU-MER'))
+    test_release = datetime(2024, 11, 5)
+    test_own_release = datetime(2025, 1, 1)
+    for product_suffix in ['CAT', 'VIS', 'Y', 'MORPH_CAT', 'CUTOUTS_CAT', 'SPE_CAT', 'OWN_CAT']:
+        test_observation.planes[f'TILE1_{product_suffix}'] = Plane(f'TILE1_{product_suffix}')
+    test_observation.planes['TILE1_Y'].meta_release = test_release
+    test_observation.planes['TILE1_OWN_CAT'].meta_release = test_own_release
+    main_app.update_catalogue_meta_release(test_observation)
+    for product_suffix in ['CAT', 'MORPH_CAT', 'CUTOUTS_CAT', 'SPE_CAT']:
+        assert test_observation.planes[f'TILE1_{product_suffix}'].meta_release == test_release, product_suffix
+    assert test_observation.planes['TILE1_OWN_CAT'].meta_release == test_own_release, 'not replaced'
+    assert test_observation.planes['TILE1_VIS'].meta_release is None, 'not a catalogue'
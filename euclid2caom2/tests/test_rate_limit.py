@@ -0,0 +1,175 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+from mock import Mock, patch
+
+from euclid2caom2 import rate_limit
+
+import pytest
+
+
+def test_is_throttled():
+    response_mock = Mock()
+    response_mock.status_code = 503
+    test_cause = Exception('Server Error')
+    test_cause.response = response_mock
+    try:
+        try:
+            raise test_cause
+        except Exception as e:
+            raise RuntimeError('Could not query') from e
+    except RuntimeError as e:
+        assert rate_limit.is_throttled(e), 'status code of the cause'
+    assert rate_limit.is_throttled(Exception('429 Client Error: Too Many Requests for url')), 'message'
+    assert not rate_limit.is_throttled(Exception('404 Not Found')), 'not throttled'
+    assert rate_limit.is_rejected(Exception('429 Client Error: Too Many Requests for url')), 'rejected'
+    assert not rate_limit.is_rejected(test_cause), 'a 503 may follow an applied call'
+
+
+def test_is_transient():
+    response_mock = Mock()
+    response_mock.status_code = 502
+    test_cause = Exception('Bad Gateway')
+    test_cause.response = response_mock
+    assert rate_limit.is_transient(test_cause), 'status code'
+    assert rate_limit.is_transient(Exception('500 Server Error: Internal Server Error for url')), 'message'
+    assert rate_limit.is_transient(Exception('429 Client Error: Too Many Requests for url')), 'throttled'
+    assert rate_limit.is_transient(TimeoutError('timed out')), 'timeout'
+    try:
+        try:
+            raise ConnectionError('reset by peer')
+        except ConnectionError as e:
+            raise RuntimeError('Could not retrieve') from e
+    except RuntimeError as e:
+        assert rate_limit.is_transient(e), 'connection error cause'
+    assert not rate_limit.is_transient(Exception('404 Client Error: Not Found for url')), 'missing file'
+    assert not rate_limit.is_transient(ValueError('Header missing END card.')), 'bad header'
+
+
+@patch('euclid2caom2.rate_limit.sleep')
+@patch('euclid2caom2.rate_limit.monotonic')
+def test_aimd_rate_limiter(monotonic_mock, sleep_mock):
+    monotonic_mock.return_value = 100.0
+    test_subject = rate_limit.AIMDRateLimiter('data', 4.0, min_rate=1.0, max_rate=5.0, max_latency_s=2.0)
+
+    # one token available, and then a reservation every 1/rate seconds
+    assert test_subject.acquire() == 0.0, 'burst'
+    assert test_subject.acquire() == pytest.approx(0.25), 'first wait'
+    assert test_subject.acquire() == pytest.approx(0.5), 'second wait'
+    assert sleep_mock.call_count == 2, 'waits'
+
+    test_subject.record(0.1, throttled=False)
+    assert test_subject.rate == pytest.approx(4.25), 'additive increase'
+    test_subject.record(0.1, throttled=True)
+    assert test_subject.rate == pytest.approx(2.125), 'multiplicative decrease'
+    test_subject.record(3.0, throttled=False)
+    assert test_subject.rate == pytest.approx(2.125), 'one decrease per max_latency_s'
+    monotonic_mock.return_value = 103.0
+    test_subject.record(3.0, throttled=False)
+    assert test_subject.rate == pytest.approx(1.0625), 'slow call decrease'
+    monotonic_mock.return_value = 106.0
+    test_subject.record(0.1, throttled=True)
+    assert test_subject.rate == 1.0, 'min_rate'
+    for ignore in range(20):
+        test_subject.record(0.1, throttled=False)
+    assert test_subject.rate == 5.0, 'max_rate'
+
+
+@patch('euclid2caom2.rate_limit.sleep')
+def test_service_limits(sleep_mock):
+    test_subject = rate_limit.ServiceLimits()
+    test_subject.open({'metadata': 8.0}, max_latency_s=5.0, retries=2)
+    assert test_subject.get('data') is None, 'data not limited'
+    fn_mock = Mock(return_value='result')
+    assert test_subject.call('data', fn_mock, 'a', key='b') == 'result', 'unlimited call'
+    fn_mock.assert_called_with('a', key='b')
+
+    # throttled calls are repeated, at a lower rate
+    fn_mock.side_effect = [Exception('503 Service Unavailable'), 'result']
+    assert test_subject.call('metadata', fn_mock, 'a') == 'result', 'repeated call'
+    assert test_subject.get('metadata').rate == pytest.approx(4.0 + 1 / 4.0), 'decreased, then increased'
+
+    fn_mock.side_effect = Exception('400 Bad Request')
+    with pytest.raises(Exception, match='Bad Request'):
+        test_subject.call('metadata', fn_mock)
+    assert fn_mock.call_count == 4, 'errors that are not throttling are not repeated'
+    assert test_subject.get('metadata').rate > 4.0 + 1 / 4.0, 'errors do not decrease the rate'
+
+    fn_mock.side_effect = Exception('503 Service Unavailable')
+    with pytest.raises(Exception, match='Service Unavailable'):
+        test_subject.call('metadata', fn_mock)
+    assert fn_mock.call_count == 7, 'throttled calls are repeated retries times'
+
+    # a write is repeated after a 429, but not after a 503, which may follow an applied write
+    fn_mock.reset_mock()
+    fn_mock.side_effect = [Exception('429 Too Many Requests'), 'result']
+    assert test_subject.call('metadata', fn_mock, write=True) == 'result', 'rejected write repeated'
+    fn_mock.side_effect = Exception('503 Service Unavailable')
+    with pytest.raises(Exception, match='Service Unavailable'):
+        test_subject.call('metadata', fn_mock, write=True)
+    assert fn_mock.call_count == 3, 'write not repeated after a 503'
@@ -66,7 +66,10 @@
 # ***********************************************************************
 #
 
-from euclid2caom2 import EUCLIDName
+from caom2pipe import manage_composable as mc
+from euclid2caom2 import EUCLIDName, EUCLIDNameParts
+
+import pytest
 
 
 def test_is_valid():
@@ -118,3 +121,36 @@ def test_storage_name(test_config):
             test_subject = EUCLIDName(source_names=[uri])
             assert test_subject.obs_id == tile_id, f'obs id {uri}'
             assert test_subject.product_id == f'{tile_id}_{product_id}', f'product id {uri}'
+
+
+def test_storage_name_parts(test_config):
+    test_subject = EUCLIDName(
+        source_names=['esa:EUCLID/EUC_MER_MOSAIC-NIR-Y-RMS_TILE102165193-683034_20240526T184144.400003Z_00.00.fits']
+    )
+    assert test_subject.parts == EUCLIDNameParts(
+        processing_level='MER',
+        product_type='MOSAIC-NIR-Y-RMS',
+        instrument='NIR',
+        filter_name='Y',
+        tile='TILE102165193',
+        checksum='683034',
+        timestamp='20240526T184144.400003Z',
+        version='00.00',
+        product_suffix='Y',
+        auxiliary=False,
+        weight=True,
+    ), 'parts'
+    assert test_subject.is_weight(), 'weight'
+    assert not test_subject.is_auxiliary(), 'not auxiliary'
+    assert test_subject.get_filter_name() == 'Y', 'filter'
+
+    test_subject = EUCLIDName(
+        source_names=['EUC_MER_FINAL-MORPH-CAT_TILE102070858-46295E_20241106T175236.702482Z_00.00.fits']
+    )
+    assert test_subject.is_auxiliary(), 'auxiliary'
+    assert test_subject.parts.instrument is None, 'no instrument'
+    with pytest.raises(mc.CadcException):
+        test_subject.get_filter_name()
+
+    with pytest.raises(mc.CadcException):
+        EUCLIDName(source_names=['EUC_MER_FINAL-CAT_102070858-FCBD03_20241106T175237.497132Z_00.00.fits'])
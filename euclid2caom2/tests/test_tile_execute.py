@@ -0,0 +1,639 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from mock import Mock, patch
+
+from caom2.diff import get_differences
+from caom2utils.data_util import get_local_file_info
+from caom2pipe import manage_composable as mc
+from caom2pipe.data_source_composable import StateRunnerMeta
+from euclid2caom2 import file2caom2_augmentation, headers, main_app, tile_execute
+from euclid2caom2.tile_index import TileIndex
+from test_caom_gen_visit import _svo_mock
+
+import glob
+import json
+import os
+import pytest
+
+
+def _make_clients(test_dir):
+    clients_mock = Mock()
+    clients_mock.metadata_client.read.return_value = None
+
+    def _cadcget_mock(uri, dest, fhead):
+        with open(f'{test_dir}/{os.path.basename(uri)}.header', 'rb') as f:
+            dest.write(f.read())
+
+    def _info_mock(uri):
+        temp = get_local_file_info(f'{test_dir}/{os.path.basename(uri)}.header')
+        temp.file_type = 'application/fits'
+        return temp
+
+    cadc_client_mock = Mock()
+    cadc_client_mock.cadcget.side_effect = _cadcget_mock
+    clients_mock.header_client = headers.HeaderClient(cadc_client_mock)
+    clients_mock.data_client.info.side_effect = _info_mock
+    return clients_mock
+
+
+def _make_storage_names(test_dir):
+    return [
+        main_app.EUCLIDName(source_names=[f'esa:EUCLID/{os.path.basename(entry).replace(".header", "")}'])
+        for entry in glob.glob(f'{test_dir}/*.fits.header')
+    ]
+
+
+def test_group_by_tile():
+    test_names = [
+        'EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        'EUC_MER_BGSUB-MOSAIC-NIR-Y_TILE102165193-683034_20240526T184144.400003Z_00.00.fits',
+        'EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits',
+    ]
+    test_result = tile_execute.group_by_tile([main_app.EUCLIDName([entry]) for entry in test_names])
+    assert list(test_result.keys()) == ['TILE102070858', 'TILE102165193'], 'tile order'
+    assert [entry.file_name for entry in test_result['TILE102070858']] == [test_names[0], test_names[2]], 'file order'
+    assert len(test_result['TILE102165193']) == 1, 'second tile'
+
+
+@pytest.mark.parametrize('header_prefetch', [False, True])
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_tile_executor(svo_mock, header_prefetch, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_config.header_prefetch = header_prefetch
+    test_config.tile_batching = True
+    test_dir = f'{test_data_dir}/tile1'
+    clients_mock = _make_clients(test_dir)
+    test_reporter = mc.ExecutionReporter(test_config, mc.Observable(test_config))
+    test_storage_names = _make_storage_names(test_dir)
+
+    test_subject = tile_execute.TileExecutor(
+        clients_mock, test_config, [file2caom2_augmentation], test_reporter
+    )
+    test_result = test_subject.execute('TILE102070858', test_storage_names)
+    assert len(test_result) == len(test_storage_names), 'one result per file'
+    for entry in test_result:
+        assert entry.failure is None, f'{entry.storage_name.file_name} {entry.stack}'
+    assert clients_mock.metadata_client.read.call_count == 1, 'one read per tile'
+    assert clients_mock.metadata_client.create.call_count == 1, 'one create per tile'
+    assert not clients_mock.metadata_client.update.called, 'no update for a new tile'
+    cadcget_mock = clients_mock.header_client._cadc_client.cadcget
+    assert cadcget_mock.call_count == len(test_storage_names), 'one fhead per file'
+    assert all(kwargs.get('fhead') for ignore, kwargs in cadcget_mock.call_args_list), 'headers only'
+
+    expected = mc.read_obs_from_file(f'{test_dir}/tile1.expected.xml')
+    compare_result = get_differences(expected, test_subject.observation)
+    assert compare_result is None, '\n'.join(compare_result)
+
+
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_tile_executor_mapping_pool(svo_mock, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_dir = f'{test_data_dir}/tile1'
+    clients_mock = _make_clients(test_dir)
+    test_reporter = mc.ExecutionReporter(test_config, mc.Observable(test_config))
+    test_storage_names = _make_storage_names(test_dir)
+
+    with ProcessPoolExecutor(max_workers=2) as test_pool:
+        test_subject = tile_execute.TileExecutor(
+            clients_mock, test_config, [file2caom2_augmentation], test_reporter, test_pool
+        )
+        test_result = test_subject.execute('TILE102070858', test_storage_names)
+    for entry in test_result:
+        assert entry.failure is None, f'{entry.storage_name.file_name} {entry.stack}'
+    assert clients_mock.metadata_client.create.call_count == 1, 'one create per tile'
+    expected = mc.read_obs_from_file(f'{test_dir}/tile1.expected.xml')
+    compare_result = get_differences(expected, test_subject.observation)
+    assert compare_result is None, '\n'.join(compare_result)
+
+    # a second pass updates the existing Artifacts, Parts and Chunks
+    test_artifacts = {
+        uri: artifact for plane in test_subject.observation.planes.values() for uri, artifact in plane.artifacts.items()
+    }
+    test_chunks = {
+        uri: [chunk for part in artifact.parts.values() for chunk in part.chunks]
+        for uri, artifact in test_artifacts.items()
+    }
+    clients_mock.metadata_client.read.return_value = test_subject.observation
+    with ProcessPoolExecutor(max_workers=2) as test_pool:
+        test_subject = tile_execute.TileExecutor(
+            clients_mock, test_config, [file2caom2_augmentation], test_reporter, test_pool
+        )
+        test_subject.execute('TILE102070858', test_storage_names)
+    assert not clients_mock.metadata_client.update.called, 'no update for an unchanged tile'
+    for plane in test_subject.observation.planes.values():
+        for uri, artifact in plane.artifacts.items():
+            assert artifact is test_artifacts[uri], f'artifact {uri}'
+            test_result_chunks = [chunk for part in artifact.parts.values() for chunk in part.chunks]
+            assert len(test_result_chunks) == len(test_chunks[uri]), f'chunk count {uri}'
+            for chunk, test_chunk in zip(test_result_chunks, test_chunks[uri]):
+                assert chunk is test_chunk, f'chunk {uri}'
+    for plane in test_subject.observation.planes.values():
+        assert plane.data_read_groups, f'read groups {plane.product_id}'
+
+
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_tile_executor_unmodified(svo_mock, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_dir = f'{test_data_dir}/tile1'
+    test_reporter = mc.ExecutionReporter(test_config, mc.Observable(test_config))
+    test_observation = mc.read_obs_from_file(f'{test_dir}/tile1.expected.xml')
+
+    clients_mock = _make_clients(test_dir)
+    clients_mock.metadata_client.read.return_value = test_observation
+    test_subject = tile_execute.TileExecutor(clients_mock, test_config, [file2caom2_augmentation], test_reporter)
+    test_result = test_subject.execute('TILE102070858', _make_storage_names(test_dir))
+    assert all(entry.failure is None for entry in test_result), 'success'
+    assert not clients_mock.metadata_client.update.called, 'the mapping result is the same as the existing version'
+    assert not clients_mock.metadata_client.create.called, 'existing'
+
+    test_observation = mc.read_obs_from_file(f'{test_dir}/tile1.expected.xml')
+    test_observation.type = 'flat'
+    clients_mock = _make_clients(test_dir)
+    clients_mock.metadata_client.read.return_value = test_observation
+    test_subject = tile_execute.TileExecutor(clients_mock, test_config, [file2caom2_augmentation], test_reporter)
+    test_subject.execute('TILE102070858', _make_storage_names(test_dir))
+    assert clients_mock.metadata_client.update.call_count == 1, 'one update for the changed version'
+
+
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_tile_executor_failure(svo_mock, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_dir = f'{test_data_dir}/tile1'
+    clients_mock = _make_clients(test_dir)
+    clients_mock.metadata_client.create.side_effect = mc.CadcException('write failure')
+    test_reporter = mc.ExecutionReporter(test_config, mc.Observable(test_config))
+    test_storage_names = _make_storage_names(test_dir)
+
+    test_subject = tile_execute.TileExecutor(
+        clients_mock, test_config, [file2caom2_augmentation], test_reporter
+    )
+    test_result = test_subject.execute('TILE102070858', test_storage_names)
+    assert all(entry.failure is not None for entry in test_result), 'write failure fails every file in the tile'
+
+
+@patch('euclid2caom2.tile_execute.TileExecutor.execute')
+def test_tile_runner_parallel(execute_mock, test_config):
+    test_config.tile_workers = 3
+    test_names = [
+        'EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        'EUC_MER_BGSUB-MOSAIC-NIR-Y_TILE102165193-683034_20240526T184144.400003Z_00.00.fits',
+        'EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits',
+        'EUC_MER_MOSAIC-NIR-Y-RMS_TILE102165193-683035_20240526T184144.400004Z_00.00.fits',
+    ]
+
+    def _execute_mock(obs_id, storage_names):
+        return [tile_execute.TileResult(entry, None, None) for entry in storage_names]
+
+    execute_mock.side_effect = _execute_mock
+    reporter_mock = Mock()
+    test_subject = tile_execute.TileRunner(Mock(), test_config, [], reporter_mock)
+    test_result = test_subject.run([main_app.EUCLIDName([entry]) for entry in test_names])
+    assert test_result == 0, 'wrong result'
+    assert execute_mock.call_count == 2, 'one execution per tile'
+    for args, kwargs in execute_mock.call_args_list:
+        obs_id, storage_names = args
+        assert all(entry.obs_id == obs_id for entry in storage_names), 'tile grouping'
+        assert storage_names == sorted(storage_names, key=lambda x: test_names.index(x.file_name)), 'file order'
+    assert reporter_mock.capture_success.call_count == 4, 'every file reported'
+
+
+@patch('euclid2caom2.tile_execute.TileExecutor.execute')
+def test_tile_runner_mapping_pool(execute_mock, test_config):
+    test_config.mapping_processes = 2
+    execute_mock.side_effect = lambda obs_id, storage_names: [
+        tile_execute.TileResult(entry, None, None) for entry in storage_names
+    ]
+    test_storage_names = [
+        main_app.EUCLIDName(['EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits'])
+    ]
+
+    test_subject = tile_execute.TileRunner(Mock(), test_config, [], Mock())
+    test_pool = test_subject._mapping_pool
+    assert isinstance(test_pool, ProcessPoolExecutor), 'pool built with the runner'
+    assert test_pool._mp_context.get_start_method() == 'spawn', 'no fork from a threaded process'
+    for ignore in range(2):
+        assert test_subject.run(test_storage_names) == 0, 'wrong result'
+        assert test_subject._mapping_pool is test_pool, 'one pool for every run'
+    test_subject.close()
+    assert test_subject._mapping_pool is None, 'shut down'
+    test_subject.close()
+
+
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_tile_runner_dry_run(svo_mock, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_config.dry_run = True
+    test_dir = f'{test_data_dir}/tile1'
+    clients_mock = _make_clients(test_dir)
+    reporter_mock = Mock()
+    test_storage_names = _make_storage_names(test_dir)
+    test_storage_names.append(
+        main_app.EUCLIDName(['esa:EUCLID/EUC_MER_BGMOD-VIS_TILE102070858-000000_20241105T125727.727179Z_00.00.fits'])
+    )
+
+    test_subject = tile_execute.TileRunner(clients_mock, test_config, [file2caom2_augmentation], reporter_mock)
+    assert test_subject.run(test_storage_names) == -1, 'the missing file fails'
+    assert not clients_mock.metadata_client.read.called, 'no read'
+    assert not clients_mock.metadata_client.create.called, 'no create'
+    assert not clients_mock.metadata_client.update.called, 'no update'
+    assert not reporter_mock.capture_success.called, 'no reporter'
+    assert not reporter_mock.capture_failure.called, 'no reporter'
+    assert not glob.glob(f'{tmp_path}/*.xml'), 'no xml'
+    with open(f'{tmp_path}/{tile_execute.DRY_RUN_FILE_NAME}') as f:
+        test_lines = [json.loads(line) for line in f]
+    assert len(test_lines) == 1, 'one line per tile'
+    assert test_lines[0]['tile'] == 'TILE102070858', 'tile'
+    assert test_lines[0]['files'] == len(test_storage_names), 'files'
+    assert list(test_lines[0]['failures'].keys()) == [test_storage_names[-1].file_name], 'failures'
+    assert test_lines[0]['xml_bytes'] > 0, 'xml size'
+
+
+def test_stream_todo(tmp_path):
+    test_names = [
+        'EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        'EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits',
+        'EUC_MER_FINAL-MORPH-CAT_TILE102070858-E79F53_20241106T175237.497132Z_00.00.fits',
+        '',
+        'EUC_MER_BGSUB-MOSAIC-NIR-Y_TILE102165193-683034_20240526T184144.400003Z_00.00.fits',
+        'EUC_MER_MOSAIC-NIR-Y-RMS_TILE102165193-683035_20240526T184144.400004Z_00.00.fits',
+    ]
+    test_fqn = f'{tmp_path}/todo.txt'
+    with open(test_fqn, 'w') as f:
+        f.write('\n'.join(test_names))
+
+    test_result = list(tile_execute.stream_todo(test_fqn, main_app.EUCLIDName, 2))
+    assert len(test_result) == 2, 'a window closes only at a change of tile'
+    assert [len(entry) for entry, ignore_offset in test_result] == [3, 2], 'window sizes'
+    assert test_result[-1][1] == os.stat(test_fqn).st_size, 'end offset'
+
+    # resume from the offset recorded after the first window
+    test_resumed = list(tile_execute.stream_todo(test_fqn, main_app.EUCLIDName, 2, test_result[0][1]))
+    assert [entry.file_name for entry in test_resumed[0][0]] == test_names[4:], 'resumed entries'
+
+
+@patch('euclid2caom2.tile_execute.EUCLIDClientCollection')
+@patch('euclid2caom2.tile_execute.TileRunner.run')
+def test_run_by_todo_tile_resume(run_mock, clients_mock, test_config, tmp_path, change_test_dir):
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.todo_window = 1
+    test_names = [
+        'EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        'EUC_MER_BGSUB-MOSAIC-NIR-Y_TILE102165193-683034_20240526T184144.400003Z_00.00.fits',
+        'EUC_MER_BGSUB-MOSAIC-VIS_TILE102160000-683036_20240526T184144.400003Z_00.00.fits',
+    ]
+    with open(test_config.work_fqn, 'w') as f:
+        f.write('\n'.join(test_names))
+
+    # the second window stops the run
+    run_mock.side_effect = [0, mc.CadcException('stopped')]
+    with pytest.raises(mc.CadcException):
+        tile_execute.run_by_todo_tile(test_config, [], main_app.EUCLIDName)
+
+    run_mock.reset_mock(side_effect=True)
+    run_mock.return_value = 0
+    test_result = tile_execute.run_by_todo_tile(test_config, [], main_app.EUCLIDName)
+    assert test_result == 0, 'wrong result'
+    assert run_mock.call_count == 2, 'resumed at the second window'
+    assert run_mock.call_args_list[0].args[0][0].file_name == test_names[1], 'resumed entry'
+
+    # a completed todo file starts again from the beginning
+    assert tile_execute.TodoProgress(test_config.progress_fqn, test_config.work_fqn).read() == 0, 'completed'
+
+
+@patch('euclid2caom2.tile_execute.EUCLIDClientCollection')
+@patch('euclid2caom2.tile_execute.TileRunner.run')
+def test_run_by_todo_tile_retry_failures(run_mock, clients_mock, test_config, tmp_path, change_test_dir):
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.retry_failures = True
+    with pytest.raises(mc.CadcException, match='retry_failures'):
+        tile_execute.run_by_todo_tile(test_config, [], main_app.EUCLIDName)
+    assert not run_mock.called, 'rejected at start-up'
+    assert not clients_mock.called, 'no clients'
+
+
+@patch('euclid2caom2.tile_execute.EUCLIDClientCollection')
+@patch('euclid2caom2.tile_execute.TileRunner.run')
+def test_run_by_todo_tile_local(run_mock, clients_mock, test_config, tmp_path, change_test_dir):
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = True
+    test_config.data_sources = []
+    with pytest.raises(mc.CadcException):
+        tile_execute.run_by_todo_tile(test_config, [], main_app.EUCLIDName)
+
+    test_names = [
+        'EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        'EUC_MER_BGSUB-MOSAIC-NIR-Y_TILE102165193-683034_20240526T184144.400003Z_00.00.fits',
+    ]
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / test_names[0]).write_text('')
+    (tmp_path / 'sub' / test_names[1]).write_text('')
+    (tmp_path / 'EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.txt').write_text('')
+    test_config.data_sources = [tmp_path.as_posix()]
+    test_config.data_source_extensions = ['.fits']
+    run_mock.return_value = 0
+    for recurse, expected in [(False, test_names[:1]), (True, test_names)]:
+        test_config.recurse_data_sources = recurse
+        run_mock.reset_mock()
+        assert tile_execute.run_by_todo_tile(test_config, [], main_app.EUCLIDName) == 0, 'wrong result'
+        test_storage_names = run_mock.call_args.args[0]
+        assert sorted(entry.file_name for entry in test_storage_names) == expected, f'recurse {recurse}'
+        assert all(os.path.isabs(entry.source_names[0]) for entry in test_storage_names), 'local source names'
+
+
+@patch('euclid2caom2.tile_execute.EUCLIDClientCollection')
+@patch('caom2pipe.manage_composable.State')
+@patch('euclid2caom2.tile_execute.TileRunner.run')
+def test_run_by_state_tile(run_mock, state_mock, clients_mock, test_config, tmp_path, change_test_dir):
+    test_config.change_working_directory(tmp_path.as_posix())
+    with open(test_config.state_fqn, 'w') as f:
+        f.write('bookmarks: {}\n')
+    run_mock.return_value = 0
+    test_start = datetime.now(tz=timezone.utc).replace(tzinfo=None) - timedelta(minutes=90)
+    state_mock.return_value.get_bookmark.return_value = test_start
+    test_name = 'esa:EUCLID/EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits'
+    source_mock = Mock()
+    source_mock.interval = timedelta(minutes=60)
+    source_mock.get_time_box_work.side_effect = [deque([StateRunnerMeta(test_name, test_start)]), deque()]
+
+    test_result = tile_execute.run_by_state_tile(
+        test_config, [], main_app.EUCLIDName, source_mock, 'euclid_timestamp'
+    )
+    assert test_result == 0, 'wrong result'
+    assert source_mock.get_time_box_work.call_count == 2, 'two time-boxes'
+    assert run_mock.call_count == 1, 'no run for an empty time-box'
+    assert run_mock.call_args.args[0][0].file_name == os.path.basename(test_name), 'wrong work'
+    assert state_mock.return_value.save_state.call_count == 2, 'bookmark saved per time-box'
+
+
+@patch('euclid2caom2.tile_execute.EUCLIDClientCollection')
+@patch('caom2pipe.manage_composable.State')
+@patch('euclid2caom2.tile_execute.TileRunner.run')
+def test_run_by_state_tile_index(run_mock, state_mock, clients_mock, test_config, tmp_path, change_test_dir):
+    test_config.change_working_directory(tmp_path.as_posix())
+    with open(test_config.state_fqn, 'w') as f:
+        f.write('bookmarks: {}\n')
+    run_mock.return_value = 0
+    test_start = datetime.now(tz=timezone.utc).replace(tzinfo=None) - timedelta(minutes=90)
+    state_mock.return_value.get_bookmark.return_value = test_start
+    test_names = [
+        'esa:EUCLID/EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits',
+        'esa:EUCLID/EUC_MER_FINAL-CAT_TILE102070858-FCBD03_20241106T175237.497132Z_00.00.fits',
+    ]
+    source_mock = Mock()
+    source_mock.interval = timedelta(minutes=60)
+    source_mock.get_time_box_work.side_effect = [
+        deque([StateRunnerMeta(test_names[0], test_start)]), deque([StateRunnerMeta(test_names[1], test_start)])
+    ]
+    test_index = TileIndex(f'{tmp_path}/tile_index.yml', expected=frozenset(['BGMOD-VIS', 'FINAL-CAT']))
+    clients_mock.return_value.metadata_client.read.return_value = None
+
+    test_result = tile_execute.run_by_state_tile(
+        test_config, [], main_app.EUCLIDName, source_mock, 'euclid_timestamp', test_index
+    )
+    assert test_result == 0, 'wrong result'
+    assert run_mock.call_count == 1, 'no run for the incomplete tile'
+    test_storage_names = run_mock.call_args.args[0]
+    assert [entry.file_name for entry in test_storage_names] == [os.path.basename(entry) for entry in test_names], (
+        'the whole tile'
+    )
+    assert len(test_index) == 0, 'nothing held'
+    assert clients_mock.return_value.metadata_client.read.call_count == 1, 'one repository check per new tile'
+
+    # a re-delivered product of an ingested tile is not held
+    run_mock.reset_mock()
+    clients_mock.return_value.metadata_client.read.return_value = Mock()
+    source_mock.get_time_box_work.side_effect = [deque([StateRunnerMeta(test_names[0], test_start)]), deque()]
+    test_result = tile_execute.run_by_state_tile(
+        test_config, [], main_app.EUCLIDName, source_mock, 'euclid_timestamp', test_index
+    )
+    assert test_result == 0, 'wrong result'
+    assert run_mock.call_count == 1, 'run for the re-delivery'
+    assert [entry.file_name for entry in run_mock.call_args.args[0]] == [os.path.basename(test_names[0])], (
+        're-delivered file'
+    )
+    assert len(test_index) == 0, 'nothing held'
+
+
+@patch('euclid2caom2.tile_execute.EUCLIDClientCollection')
+@patch('euclid2caom2.tile_execute.TileRunner.run')
+def test_run_by_state_tile_daemon(run_mock, clients_mock, test_config, tmp_path, change_test_dir):
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.poll_interval = 0
+    test_start = datetime.now(tz=timezone.utc).replace(tzinfo=None) - timedelta(minutes=90)
+    mc.write_as_yaml({'bookmarks': {'euclid_timestamp': {'last_record': test_start}}}, test_config.state_fqn)
+    test_bookmark = mc.State(test_config.state_fqn).get_bookmark('euclid_timestamp')
+    test_name = 'esa:EUCLID/EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits'
+    source_mock = Mock()
+    source_mock.interval = timedelta(minutes=60)
+    # the first poll fails, and the second starts again from the bookmark
+    source_mock.get_time_box_work.side_effect = [
+        mc.CadcException('inventory unavailable'), deque([StateRunnerMeta(test_name, test_start)])
+    ]
+    test_stop = tile_execute.Event()
+
+    def _run_mock(storage_names):
+        # as for SIGTERM part-way through a time-box
+        test_stop.set()
+        return 0
+
+    run_mock.side_effect = _run_mock
+    test_result = tile_execute.run_by_state_tile_daemon(
+        test_config, [], main_app.EUCLIDName, source_mock, 'euclid_timestamp', stop=test_stop
+    )
+    assert test_result == -1, 'failed poll'
+    assert source_mock.get_time_box_work.call_count == 2, 'stopped after the time-box in progress'
+    assert run_mock.call_count == 1, 'one run'
+    assert clients_mock.call_count == 1, 'clients set up once'
+    assert mc.State(test_config.state_fqn).get_bookmark('euclid_timestamp') == test_bookmark + timedelta(
+        minutes=60
+    ), 'bookmark saved for the completed time-box'
+    assert glob.glob(f'{tmp_path}/tmp*.yml') == [], 'no temporary state files'
+
+
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_tile_executor_skip_unchanged(svo_mock, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_config.skip_unchanged = True
+    test_dir = f'{test_data_dir}/tile1'
+    clients_mock = _make_clients(test_dir)
+    test_reporter = Mock()
+    test_storage_names = _make_storage_names(test_dir)
+    first_subject = tile_execute.TileExecutor(clients_mock, test_config, [file2caom2_augmentation], test_reporter)
+    first_subject.execute('TILE102070858', test_storage_names)
+
+    # the second execution finds the Observation written by the first
+    clients_mock = _make_clients(test_dir)
+    clients_mock.metadata_client.read.return_value = first_subject.observation
+    test_subject = tile_execute.TileExecutor(clients_mock, test_config, [file2caom2_augmentation], test_reporter)
+    test_result = test_subject.execute('TILE102070858', _make_storage_names(test_dir))
+    assert all(entry.skipped and entry.failure is None for entry in test_result), 'every file unchanged'
+    assert not clients_mock.header_client._cadc_client.cadcget.called, 'no headers'
+    assert not clients_mock.metadata_client.update.called, 'no write'
+
+    runner = tile_execute.TileRunner(clients_mock, test_config, [], test_reporter)
+    assert runner._report(test_result, 0) == 0, 'skipped is not a failure'
+    test_reporter.add_skipped.assert_called_with(len(test_result))
+    assert not test_reporter.capture_todo.called, 'skipped is not todo'
+    assert not test_reporter.capture_success.called, 'skipped is not a success'
+
+
+def test_io_engine():
+    attempts = []
+
+    def _flaky(value):
+        attempts.append(value)
+        if len(attempts) < 2:
+            raise mc.CadcException('Could not retrieve') from ConnectionError('temporary')
+        return value
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        test_subject = tile_execute.IOEngine(pool, {'data': 1}, retries=1, backoff_s=0)
+        assert asyncio.run(test_subject.call('data', _flaky, 'abc')) == 'abc', 'retried'
+        assert len(attempts) == 2, 'one retry'
+
+        attempts.clear()
+        with pytest.raises(mc.CadcException):
+            asyncio.run(test_subject.call('data', _flaky, 'abc', retry=False))
+        assert len(attempts) == 1, 'no retry'
+
+        # an error that will happen again is not retried
+        missing_mock = Mock(side_effect=mc.CadcException('404 Client Error: Not Found'))
+        with pytest.raises(mc.CadcException):
+            asyncio.run(test_subject.call('data', missing_mock))
+        assert missing_mock.call_count == 1, 'not transient'
+
+
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_async_tile_executor(svo_mock, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_dir = f'{test_data_dir}/tile1'
+    clients_mock = _make_clients(test_dir)
+    test_reporter = mc.ExecutionReporter(test_config, mc.Observable(test_config))
+    test_storage_names = _make_storage_names(test_dir)
+
+    async def _execute(test_subject):
+        with ThreadPoolExecutor(max_workers=4) as io_pool, ThreadPoolExecutor(max_workers=1) as cpu_pool:
+            engine = tile_execute.IOEngine(io_pool, {'data': 4, 'metadata': 1})
+            return await test_subject.execute_async('TILE102070858', test_storage_names, engine, cpu_pool)
+
+    test_subject = tile_execute.AsyncTileExecutor(clients_mock, test_config, [file2caom2_augmentation], test_reporter)
+    test_result = asyncio.run(_execute(test_subject))
+    assert [entry.storage_name for entry in test_result] == test_storage_names, 'todo order'
+    for entry in test_result:
+        assert entry.failure is None, f'{entry.storage_name.file_name} {entry.stack}'
+    assert clients_mock.metadata_client.read.call_count == 1, 'one read per tile'
+    assert clients_mock.metadata_client.create.call_count == 1, 'one create per tile'
+
+    expected = mc.read_obs_from_file(f'{test_dir}/tile1.expected.xml')
+    compare_result = get_differences(expected, test_subject.observation)
+    assert compare_result is None, '\n'.join(compare_result)
+
+
+@patch('caom2pipe.astro_composable.get_vo_table')
+def test_tile_executor_header_store(svo_mock, test_config, test_data_dir, tmp_path, change_test_dir):
+    svo_mock.side_effect = _svo_mock
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.use_local_files = False
+    test_config.header_store_directory = f'{tmp_path}/header_store'
+    test_dir = f'{test_data_dir}/tile1'
+    test_reporter = mc.ExecutionReporter(test_config, mc.Observable(test_config))
+    first_subject = tile_execute.TileExecutor(
+        _make_clients(test_dir), test_config, [file2caom2_augmentation], test_reporter
+    )
+    first_subject.execute('TILE102070858', _make_storage_names(test_dir))
+
+    # re-derive the Observation with no storage access
+    test_config.header_store_offline = True
+    clients_mock = _make_clients(test_dir)
+    test_subject = tile_execute.TileExecutor(clients_mock, test_config, [file2caom2_augmentation], test_reporter)
+    test_result = test_subject.execute('TILE102070858', _make_storage_names(test_dir))
+    for entry in test_result:
+        assert entry.failure is None, f'{entry.storage_name.file_name} {entry.stack}'
+    assert not clients_mock.data_client.info.called, 'no info'
+    assert not clients_mock.header_client._cadc_client.cadcget.called, 'no headers'
+    compare_result = get_differences(first_subject.observation, test_subject.observation)
+    assert compare_result is None, '\n'.join(compare_result)
@@ -0,0 +1,148 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+from datetime import datetime, timedelta
+
+from euclid2caom2.main_app import EUCLID_TILE_PRODUCT_TYPES
+from euclid2caom2.tile_index import TileIndex
+
+import pytest
+import yaml
+
+
+def _names(tile, product_types):
+    return [
+        f'esa:EUCLID/EUC_MER_{product_type}_{tile}-F79595_20241105T125727.727179Z_00.00.fits'
+        for product_type in sorted(product_types)
+    ]
+
+
+def test_tile_index(tmp_path):
+    test_fqn = f'{tmp_path}/tile_index.yml'
+    assert len(EUCLID_TILE_PRODUCT_TYPES) == 27, '4 filters x 6 products, and 3 catalogues'
+    test_subject = TileIndex(test_fqn)
+    test_names = _names('TILE102070858', EUCLID_TILE_PRODUCT_TYPES)
+    test_subject.add(test_names[:-1])
+    test_subject.add(_names('TILE102165193', ['FINAL-CAT']))
+    assert test_subject.ready() == {}, 'incomplete'
+    assert len(test_subject) == 2, 'held'
+
+    # a later invocation finds the held products
+    test_subject = TileIndex(test_fqn)
+    test_subject.add(test_names[-1:])
+    test_result = test_subject.ready()
+    assert list(test_result.keys()) == ['TILE102070858'], 'complete'
+    assert sorted(test_result['TILE102070858']) == sorted(test_names), 'all the products'
+
+    # a newer version of a product replaces the older one
+    test_newer = test_names[0].replace('F79595', 'A00000')
+    test_subject.add([test_newer])
+    assert test_newer in test_subject.ready()['TILE102070858'], 'newer'
+    assert test_names[0] not in test_subject.ready()['TILE102070858'], 'older'
+
+    with open(test_fqn) as f:
+        test_first_seen = {tile: entry['first_seen'] for tile, entry in yaml.safe_load(f)['tiles'].items()}
+    assert TileIndex.oldest(test_fqn) == datetime.fromisoformat(test_first_seen['TILE102070858']), 'oldest'
+    test_subject.remove(['TILE102070858'])
+    assert len(TileIndex(test_fqn)) == 1, 'removal persisted'
+    assert TileIndex.oldest(test_fqn) == datetime.fromisoformat(test_first_seen['TILE102165193']), 'oldest held'
+    assert TileIndex.oldest(f'{tmp_path}/not_there.yml') is None, 'no index file'
+
+
+def test_tile_index_timeout(tmp_path):
+    test_fqn = f'{tmp_path}/tile_index.yml'
+    test_subject = TileIndex(test_fqn, timeout=timedelta(seconds=-1))
+    test_subject.add(_names('TILE102165193', ['FINAL-CAT']))
+    assert list(test_subject.ready().keys()) == ['TILE102165193'], 'timed out'
+    # ready is the first call on an index read from the file
+    assert list(TileIndex(test_fqn, timeout=timedelta(seconds=-1)).ready().keys()) == ['TILE102165193'], 'read'
+
+
+def test_tile_index_ingested(tmp_path):
+    test_fqn = f'{tmp_path}/tile_index.yml'
+    test_subject = TileIndex(test_fqn)
+    test_checked = []
+
+    def _has_observation(tile):
+        test_checked.append(tile)
+        return tile == 'TILE102070858'
+
+    test_subject.add(_names('TILE102070858', ['BGMOD-VIS']), _has_observation)
+    test_subject.add(_names('TILE102165193', ['FINAL-CAT']), _has_observation)
+    test_subject.add(_names('TILE102165193', ['BGMOD-VIS']), _has_observation)
+    assert test_checked == ['TILE102070858', 'TILE102165193'], 'checked once per tile'
+    # the re-delivery is ready, from a later invocation too, and the new tile is held
+    assert list(TileIndex(test_fqn).ready().keys()) == ['TILE102070858'], 're-delivery'
+
+
+def test_tile_index_version(tmp_path):
+    test_fqn = f'{tmp_path}/tile_index.yml'
+    with open(test_fqn, 'w') as f:
+        yaml.safe_dump({'version': TileIndex.VERSION + 1, 'tiles': {}}, f)
+    with pytest.raises(ValueError):
+        TileIndex(test_fqn)
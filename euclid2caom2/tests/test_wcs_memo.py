@@ -0,0 +1,147 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+from caom2 import Artifact, Axis, Chunk, CoordAxis1D, ProductType, ReleaseType, SpectralWCS
+from caom2.diff import get_differences
+from caom2utils import data_util
+from caom2utils.blueprints import ObsBlueprint
+from caom2utils.parsers import FitsParser
+from caom2utils.wcs_parsers import FitsWcsParser
+from euclid2caom2 import file2caom2_augmentation
+from euclid2caom2.wcs_memo import MemoizedFitsWcsParser, wcs_key
+
+
+_BGSUB = 'EUC_MER_BGSUB-MOSAIC-VIS_TILE102070858-5ED2D5_20241105T125727.727353Z_00.00'
+
+
+def _augment(parser_class, header):
+    chunk = Chunk()
+    chunk.naxis = header.get('NAXIS')
+    parser = parser_class(header, 'test.fits', '0')
+    parser.augment_position(chunk)
+    parser.augment_energy(chunk)
+    return chunk, parser
+
+
+def test_euclid_fits_parser(test_data_dir):
+    # EUCLIDFitsParser.augment_artifact repeats the FitsParser.augment_artifact loop, with a MemoizedFitsWcsParser
+    test_header = data_util.get_local_file_headers(f'{test_data_dir}/tile1/{_BGSUB}.fits.header')
+    test_uri = f'esa:EUCLID/{_BGSUB}.fits'
+    MemoizedFitsWcsParser.memo.clear()
+    artifacts = []
+    for parser_class in [FitsParser, file2caom2_augmentation.EUCLIDFitsParser]:
+        artifact = Artifact(test_uri, ProductType.SCIENCE, ReleaseType.DATA)
+        parser_class(test_header, ObsBlueprint(position_axes=(1, 2)), test_uri).augment_artifact(artifact)
+        artifacts.append(artifact)
+    assert len(artifacts[0].parts) > 0, 'parts'
+    compare_result = get_differences(artifacts[0], artifacts[1])
+    assert compare_result is None, '\n'.join(compare_result)
+
+
+def test_memoized_fits_wcs_parser(test_data_dir):
+    test_fqns = [
+        f'{test_data_dir}/tile1/{f_name}.fits.header'
+        for f_name in [
+            'EUC_MER_BGSUB-MOSAIC-VIS_TILE102070858-5ED2D5_20241105T125727.727353Z_00.00',
+            'EUC_MER_MOSAIC-VIS-RMS_TILE102070858-BB87CE_20241104T161703.183124Z_00.00',
+        ]
+    ]
+    test_headers = [data_util.get_local_file_headers(test_fqn)[0] for test_fqn in test_fqns]
+    assert wcs_key(test_headers[0]) == wcs_key(test_headers[1]), 'same WCS'
+    test_other = test_headers[1].copy()
+    test_other['CRVAL1'] = test_other['CRVAL1'] + 1.0
+    assert wcs_key(test_other) != wcs_key(test_headers[1]), 'different WCS'
+
+    MemoizedFitsWcsParser.memo.clear()
+    for test_header in test_headers:
+        expected, _ = _augment(FitsWcsParser, test_header)
+        test_chunk, test_parser = _augment(MemoizedFitsWcsParser, test_header)
+        assert str(test_chunk.position) == str(expected.position), 'position'
+        assert test_chunk.position_axis_1 == expected.position_axis_1, 'position axis 1'
+        assert test_chunk.position_axis_2 == expected.position_axis_2, 'position axis 2'
+        assert str(test_chunk.energy) == str(expected.energy), 'energy'
+        assert test_chunk.energy_axis == expected.energy_axis, 'energy axis'
+    assert test_parser._wcsprm is None, 'memoized, no Wcsprm'
+    assert test_parser.wcs is not None and test_parser.wcs is test_parser._wcsprm, 'built on first use'
+    assert test_chunk.position is not expected.position, 'copied'
+
+    # the energy a chunk already has, e.g. from the repository, is not memoized for the other chunks with the same
+    # WCS, because augment_energy does not set it for a 2-D mosaic
+    MemoizedFitsWcsParser.memo.clear()
+    test_energy = SpectralWCS(CoordAxis1D(Axis('WAVE', 'm')), 'TOPOCENT')
+    repository_chunk = Chunk()
+    repository_chunk.naxis = test_headers[0].get('NAXIS')
+    repository_chunk.energy = test_energy
+    test_parser = MemoizedFitsWcsParser(test_headers[0], 'test.fits', '0')
+    test_parser.augment_position(repository_chunk)
+    test_parser.augment_energy(repository_chunk)
+    assert repository_chunk.energy is test_energy, 'existing energy kept'
+    assert repository_chunk.position is not None, 'position'
+    test_chunk, ignore = _augment(MemoizedFitsWcsParser, test_headers[1])
+    assert test_chunk.energy is None, 'no energy from the other chunk'
+    assert str(test_chunk.position) == str(repository_chunk.position), 'memoized position'
@@ -0,0 +1,1064 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Implements TILE-at-a-time execution. All the files of one Euclid TILE are applied, in todo order, to one in-memory
+Observation, so there is one repository read and one repository write per TILE, instead of one of each per file.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import traceback
+from collections import namedtuple
+from concurrent.futures import as_completed, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime, timezone
+from functools import partial
+from io import BytesIO
+from threading import Event, Lock
+
+from cadcdata import StorageInventoryClient
+from caom2 import ObservationWriter
+from caom2.diff import get_differences
+from caom2utils import data_util
+from caom2pipe import client_composable as clc
+from caom2pipe import manage_composable as mc
+from euclid2caom2 import headers
+from euclid2caom2.footprint import update_plane_positions
+from euclid2caom2.header_store import HeaderStore
+from euclid2caom2.incremental import save_bookmark
+from euclid2caom2.metrics import stage_metrics, storage_name_labels
+from euclid2caom2.rate_limit import is_transient, service_limits
+
+
+__all__ = [
+    'AsyncTileExecutor',
+    'AsyncTileRunner',
+    'DryRunSummary',
+    'EUCLIDClientCollection',
+    'group_by_tile',
+    'IOEngine',
+    'run_by_state_tile',
+    'run_by_state_tile_daemon',
+    'run_by_todo_tile',
+    'stream_todo',
+    'TileExecutor',
+    'TileResult',
+    'TileRunner',
+    'TodoProgress',
+]
+
+
+# the number of times, and the initial delay before, a storage or repository call that failed with a transient error
+# is retried in async_io mode
+IO_RETRIES = 2
+IO_BACKOFF_S = 1.0
+# the per-TILE results of a dry_run, found in the working_directory
+DRY_RUN_FILE_NAME = 'dry_run.jsonl'
+# the outcome of applying one file to the TILE Observation - failure is None on success, and skipped is True when
+# the file is unchanged from the Artifact already in the Observation
+TileResult = namedtuple('TileResult', 'storage_name failure stack skipped', defaults=(False,))
+
+
+class EUCLIDClientCollection(clc.ClientCollection):
+    """
+    Adds a HeaderClient, which retrieves the headers as text, so that only the HDUs and keywords a mapping uses are
+    parsed.
+    """
+
+    def __init__(self, config, metrics=None):
+        super().__init__(config)
+        self._header_client = headers.HeaderClient(
+            StorageInventoryClient(clc.define_subject(config), resource_id=config.storage_inventory_resource_id),
+            metrics,
+        )
+
+    @property
+    def header_client(self):
+        return self._header_client
+
+
+def group_by_tile(storage_names):
+    """
+    :param storage_names: StorageName instances, in todo order
+    :return: dict, keyed by obs_id, of lists of StorageName instances. Both the TILEs and the files within each
+        TILE retain their todo order.
+    """
+    result = {}
+    for storage_name in storage_names:
+        result.setdefault(storage_name.obs_id, []).append(storage_name)
+    return result
+
+
+class TileExecutor:
+    """
+    Applies the metadata visitors for all the files of one TILE to one Observation, with one repository read
+    before the first file, and one repository write after the last file. An existing Observation is only
+    written when it differs from the version that was read.
+
+    With config.header_store_directory, retrieved headers are kept in a HeaderStore, by URI and checksum, and
+    are retrieved from there while the file is unchanged. With config.header_store_offline as well, the file
+    information and headers come only from the HeaderStore.
+
+    Visitors that provide get_header_keywords get the headers as keyword to value mappings, which are much
+    cheaper to build than fits.Header instances.
+
+    With config.header_prefetch, the headers for all the files of the TILE are retrieved concurrently, before the
+    first file is visited, instead of one file at a time.
+
+    With config.skip_unchanged, a file whose checksum and size match those of the Artifact already in the
+    Observation is skipped: there is no header retrieval or visit for it, and if every file of the TILE is
+    skipped, there is no repository write.
+
+    With a mapping_pool, and visitors that provide get_mapping_context, map_fragment and merge_fragment, the
+    mapping of every file of the TILE is done in the pool, and the results are merged into the Observation, in
+    todo order, in the calling process.
+
+    With config.dry_run, there is no repository read or write, and no file output. The size of the Observation
+    XML is recorded in output_size instead.
+    """
+
+    def __init__(self, clients, config, meta_visitors, reporter, mapping_pool=None):
+        self._clients = clients
+        self._config = config
+        self._meta_visitors = meta_visitors
+        self._reporter = reporter
+        self._mapping_pool = mapping_pool
+        self._observation = None
+        # the Observation as it was read, for the comparison before the write
+        self._read_version = None
+        self._exists = False
+        self.output_size = None
+        self._header_store = None
+        if config.header_store_directory:
+            self._header_store = HeaderStore(config.header_store_directory)
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def observation(self):
+        return self._observation
+
+    def execute(self, obs_id, storage_names):
+        """
+        :param obs_id: str the TILE
+        :param storage_names: list of StorageName instances for the TILE, in the order they are to be applied
+        :return: list of TileResult, one per StorageName, in the same order
+        """
+        self._logger.debug(f'Begin execute for {obs_id} with {len(storage_names)} files.')
+        try:
+            self._read_observation(obs_id)
+        except Exception as e:
+            stack = traceback.format_exc()
+            return [TileResult(storage_name, e, stack) for storage_name in storage_names]
+
+        if self._config.header_prefetch and len(storage_names) > 1:
+            results = self._visit_prepared(storage_names, self._prefetch(storage_names))
+        elif self._maps_fragments():
+            results = self._visit_prepared(storage_names, [self._prepare(entry) for entry in storage_names])
+        else:
+            results = []
+            for storage_name in storage_names:
+                result = self._prepare(storage_name)
+                results.append(self._visit(storage_name) if result is None else result)
+        if _has_changes(results):
+            try:
+                self._write_observation(storage_names[0])
+            except Exception as e:
+                results = _write_failed(results, e, traceback.format_exc())
+        self._logger.debug(f'End execute for {obs_id}.')
+        return results
+
+    def _failure(self, storage_name, e):
+        stage_metrics.count('failure', **storage_name_labels(storage_name))
+        return TileResult(storage_name, e, traceback.format_exc())
+
+    def _prepare(self, storage_name):
+        """
+        :return: TileResult when there is nothing to visit for the StorageName, None otherwise
+        """
+        try:
+            return TileResult(storage_name, None, None, True) if self._retrieve(storage_name) else None
+        except Exception as e:
+            return self._failure(storage_name, e)
+
+    def _retrieve(self, storage_name):
+        """
+        Retrieves the file information and headers the visitors need.
+
+        :return: True if the StorageName is skipped, because it is unchanged
+        """
+        if self._is_unchanged(storage_name):
+            self._logger.info(f'Skipping unchanged {storage_name.file_name}.')
+            stage_metrics.count('skipped', **storage_name_labels(storage_name))
+            return True
+        self._set_preconditions(storage_name)
+        return False
+
+    def _prefetch(self, storage_names):
+        """
+        Retrieves the file information and headers for all the files of the TILE at once, with up to
+        config.data_concurrency calls in flight, into StorageName.file_info and StorageName.metadata, where the
+        visitors find them.
+
+        :return: list of the _prepare results, in the same order as storage_names
+        """
+        workers = min(self._config.data_concurrency, len(storage_names))
+        with stage_metrics.timer('prefetch', tile=storage_names[0].obs_id):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(self._prepare, storage_names))
+
+    def _visit_prepared(self, storage_names, prepared):
+        if self._maps_fragments():
+            return self._visit_fragments(storage_names, prepared)
+        return [
+            self._visit(storage_name) if result is None else result
+            for storage_name, result in zip(storage_names, prepared)
+        ]
+
+    def _maps_fragments(self):
+        return self._mapping_pool is not None and all(
+            hasattr(visitor, 'map_fragment') for visitor in self._meta_visitors
+        )
+
+    def _visit_fragments(self, storage_names, prepared):
+        # all the files of the TILE are mapped at once, then merged in todo order
+        submitted = [
+            self._submit_fragments(storage_name) if result is None else result
+            for storage_name, result in zip(storage_names, prepared)
+        ]
+        return [
+            self._merge_fragments(storage_name, entry) if isinstance(entry, list) else entry
+            for storage_name, entry in zip(storage_names, submitted)
+        ]
+
+    def _submit_fragments(self, storage_name):
+        """
+        :return: list of Future, one per visitor, or a TileResult, when the mapping contexts cannot be made
+        """
+        try:
+            return [
+                self._mapping_pool.submit(
+                    visitor.map_fragment, visitor.get_mapping_context(storage_name, self._config)
+                )
+                for visitor in self._meta_visitors
+            ]
+        except Exception as e:
+            return self._failure(storage_name, e)
+
+    def _merge_fragments(self, storage_name, futures):
+        try:
+            with stage_metrics.timer('map', **storage_name_labels(storage_name)):
+                fragments = [future.result() for future in futures]
+            for visitor, fragment in zip(self._meta_visitors, fragments):
+                self._observation = visitor.merge_fragment(self._observation, fragment)
+            return TileResult(storage_name, None, None)
+        except Exception as e:
+            return self._failure(storage_name, e)
+
+    def _visit(self, storage_name):
+        try:
+            self._visit_meta(storage_name)
+            return TileResult(storage_name, None, None)
+        except Exception as e:
+            return self._failure(storage_name, e)
+
+    def _read_observation(self, obs_id):
+        self._observation = None
+        self._read_version = None
+        if mc.TaskType.INGEST in self._config.task_types and not self._config.dry_run:
+            with stage_metrics.timer('repository_read', tile=obs_id):
+                self._observation = service_limits.call(
+                    'metadata',
+                    clc.repo_get,
+                    self._clients.metadata_client,
+                    self._config.collection,
+                    obs_id,
+                    self._reporter.observable.metrics,
+                )
+                if self._observation is not None:
+                    self._read_version = deepcopy(self._observation)
+        self._exists = self._observation is not None
+
+    def _get_hdu_count(self, storage_name):
+        """
+        Visitors that provide get_hdu_count limit the headers that are retrieved. The largest count wins, and
+        a visitor that does not say, or says None, gets the headers for all the HDUs.
+        """
+        result = 0
+        for visitor in self._meta_visitors:
+            get_hdu_count = getattr(visitor, 'get_hdu_count', None)
+            count = None if get_hdu_count is None else get_hdu_count(storage_name)
+            if count is None:
+                return None
+            result = max(result, count)
+        return result
+
+    def _get_header_keywords(self, storage_name):
+        """
+        When every visitor provides get_header_keywords, and none of them says None, the headers are retrieved as
+        keyword to value mappings of the union of those keywords, instead of as fits.Header instances.
+        """
+        result = set()
+        for visitor in self._meta_visitors:
+            get_header_keywords = getattr(visitor, 'get_header_keywords', None)
+            keywords = None if get_header_keywords is None else get_header_keywords(storage_name)
+            if keywords is None:
+                return None
+            result |= keywords
+        return result
+
+    def _get_file_info(self, storage_name, index, uri):
+        if uri not in storage_name.file_info:
+            with stage_metrics.timer('info', **storage_name_labels(storage_name)):
+                storage_name.file_info[uri] = self._retrieve_file_info(storage_name, index, uri)
+        return storage_name.file_info[uri]
+
+    def _retrieve_file_info(self, storage_name, index, uri):
+        if self._config.use_local_files:
+            return data_util.get_local_file_info(storage_name.source_names[index])
+        if self._header_store is not None and self._config.header_store_offline:
+            return self._header_store.get_file_info(uri)
+        result = service_limits.call('data', self._clients.data_client.info, uri)
+        if self._header_store is not None and result is not None:
+            self._header_store.put_file_info(uri, result)
+        return result
+
+    def _retrieve_headers(self, storage_name, index, uri, hdu_count):
+        if self._config.use_local_files:
+            return headers.get_local_head(storage_name.source_names[index], hdu_count)
+        file_info = storage_name.file_info.get(uri)
+        if self._header_store is None or file_info is None:
+            # the HeaderStore keeps every keyword, so it always gets fits.Header instances
+            keywords = self._get_header_keywords(storage_name)
+            if keywords is not None:
+                return service_limits.call(
+                    'data', self._clients.header_client.get_compact_head, uri, keywords, hdu_count
+                )
+            return service_limits.call('data', self._clients.header_client.get_head, uri, hdu_count)
+        result = self._header_store.get(uri, file_info.md5sum, hdu_count)
+        if result is None:
+            if self._config.header_store_offline:
+                raise mc.CadcException(f'No headers for {uri} in the header store.')
+            result = service_limits.call('data', self._clients.header_client.get_head, uri, hdu_count)
+            self._header_store.put(uri, file_info.md5sum, result, hdu_count)
+        return result
+
+    def _is_unchanged(self, storage_name):
+        """
+        :return: True if every file of the StorageName has the checksum and size of its Artifact in the Observation
+        """
+        if not self._config.skip_unchanged or self._observation is None:
+            return False
+        for index, uri in enumerate(storage_name.destination_uris):
+            artifact = _find_artifact(self._observation, uri)
+            if artifact is None or artifact.content_checksum is None:
+                return False
+            file_info = self._get_file_info(storage_name, index, uri)
+            if (
+                file_info is None
+                or artifact.content_checksum.uri != f'md5:{file_info.md5sum}'
+                or artifact.content_length != file_info.size
+            ):
+                return False
+        return True
+
+    def _set_preconditions(self, storage_name):
+        hdu_count = self._get_hdu_count(storage_name)
+        labels = storage_name_labels(storage_name)
+        for index, uri in enumerate(storage_name.destination_uris):
+            self._get_file_info(storage_name, index, uri)
+            with stage_metrics.timer('header', **labels):
+                storage_name.metadata[uri] = self._retrieve_headers(storage_name, index, uri, hdu_count)
+
+    def _visit_meta(self, storage_name):
+        kwargs = {
+            'clients': self._clients,
+            'config': self._config,
+            'reporter': self._reporter,
+            'storage_name': storage_name,
+        }
+        for visitor in self._meta_visitors:
+            self._observation = visitor.visit(self._observation, **kwargs)
+
+    def _write_observation(self, storage_name):
+        if self._observation is None:
+            return
+        for visitor in self._meta_visitors:
+            # Observation-wide updates, once per TILE instead of once per file
+            finish_observation = getattr(visitor, 'finish_observation', None)
+            if finish_observation is not None:
+                self._observation = finish_observation(self._observation)
+        if self._config.plane_footprints:
+            self._observation = update_plane_positions(self._observation)
+        if self._config.dry_run:
+            self.output_size = _xml_size(self._observation)
+            return
+        if mc.TaskType.SCRAPE in self._config.task_types:
+            mc.write_obs_to_file(
+                self._observation, f'{self._config.working_directory}/{storage_name.model_file_name}'
+            )
+        if mc.TaskType.INGEST in self._config.task_types:
+            if self._is_unmodified():
+                self._logger.info(f'No changes to {self._observation.observation_id}. Not writing.')
+                stage_metrics.count('write_skipped', tile=self._observation.observation_id)
+                return
+            metrics = self._reporter.observable.metrics
+            with stage_metrics.timer('repository_write', tile=self._observation.observation_id):
+                # a write is repeated only when it was rejected before it was applied
+                write = clc.repo_update if self._exists else clc.repo_create
+                service_limits.call(
+                    'metadata', write, self._clients.metadata_client, self._observation, metrics, write=True
+                )
+            self._exists = True
+
+    def _is_unmodified(self):
+        if self._read_version is None:
+            return False
+        with stage_metrics.timer('diff', tile=self._observation.observation_id):
+            differences = get_differences(self._read_version, self._observation)
+        if differences is not None:
+            self._logger.debug(f'{len(differences)} differences for {self._observation.observation_id}.')
+        return differences is None
+
+
+def _xml_size(observation):
+    b = BytesIO()
+    ObservationWriter().write(observation, b)
+    return len(b.getvalue())
+
+
+def _has_changes(results):
+    return any(result.failure is None and not result.skipped for result in results)
+
+
+def _write_failed(results, e, stack):
+    # none of the visited files made it to the repository
+    return [
+        TileResult(result.storage_name, e, stack) if result.failure is None and not result.skipped else result
+        for result in results
+    ]
+
+
+def _find_artifact(observation, uri):
+    for plane in observation.planes.values():
+        if uri in plane.artifacts:
+            return plane.artifacts[uri]
+    return None
+
+
+class TileRunner:
+    """
+    Groups the work by TILE, hands each TILE to a TileExecutor, and reports the outcome of each file.
+
+    With config.tile_workers > 1, independent TILEs are executed concurrently. The files of one TILE are always
+    applied in todo order, by one TileExecutor, so the Observation-level results do not depend on the number of
+    workers. Reporting happens only in the calling thread.
+
+    With config.mapping_processes > 0, the metadata mapping is done in a pool of that many processes, so that it
+    is not limited to one core. The pool lasts as long as the runner, and close shuts it down. Its processes are
+    spawned, not forked, because the runner's process has other threads, e.g. those of tile_workers.
+
+    With config.dry_run, the outcome of each TILE goes to a DryRunSummary, instead of the reporter.
+    """
+
+    def __init__(self, clients, config, meta_visitors, reporter):
+        self._clients = clients
+        self._config = config
+        self._meta_visitors = meta_visitors
+        self._reporter = reporter
+        self._mapping_pool = None
+        if config.mapping_processes > 0:
+            # a spawned process starts with its own stage_metrics, which records nothing
+            self._mapping_pool = ProcessPoolExecutor(
+                max_workers=config.mapping_processes, mp_context=multiprocessing.get_context('spawn')
+            )
+        self._summary = None
+        if config.dry_run:
+            self._summary = DryRunSummary(os.path.join(config.working_directory, DRY_RUN_FILE_NAME))
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def run(self, storage_names):
+        """
+        :param storage_names: StorageName instances, in todo order
+        :return: 0 if every file succeeded, -1 otherwise
+        """
+        try:
+            return self._run_tiles(group_by_tile(storage_names))
+        finally:
+            stage_metrics.flush()
+
+    def has_observation(self, obs_id):
+        """
+        :return: True when the repository has the Observation for obs_id. Without repository reads, as with dry_run,
+            False.
+        """
+        if mc.TaskType.INGEST not in self._config.task_types or self._config.dry_run:
+            return False
+        observation = service_limits.call(
+            'metadata',
+            clc.repo_get,
+            self._clients.metadata_client,
+            self._config.collection,
+            obs_id,
+            self._reporter.observable.metrics,
+        )
+        return observation is not None
+
+    def close(self):
+        """Shuts down the mapping processes."""
+        if self._mapping_pool is not None:
+            self._mapping_pool.shutdown()
+            self._mapping_pool = None
+
+    def _run_tiles(self, tiles):
+        if self._config.tile_workers > 1:
+            return self._run_parallel(tiles)
+        result = 0
+        for obs_id, tile_storage_names in tiles.items():
+            result |= self._report(*self._run_tile(obs_id, tile_storage_names))
+        return result
+
+    def _run_parallel(self, tiles):
+        self._logger.info(f'Execute {len(tiles)} TILEs with {self._config.tile_workers} workers.')
+        result = 0
+        with ThreadPoolExecutor(max_workers=self._config.tile_workers) as pool:
+            futures = [
+                pool.submit(self._run_tile, obs_id, tile_storage_names)
+                for obs_id, tile_storage_names in tiles.items()
+            ]
+            for future in as_completed(futures):
+                result |= self._report(*future.result())
+        return result
+
+    def _run_tile(self, obs_id, storage_names):
+        start_s = datetime.now(tz=timezone.utc).timestamp()
+        executor = TileExecutor(
+            self._clients, self._config, self._meta_visitors, self._reporter, self._mapping_pool
+        )
+        results = executor.execute(obs_id, storage_names)
+        self._summarize(obs_id, results, start_s, executor)
+        return results, start_s
+
+    def _summarize(self, obs_id, results, start_s, executor):
+        if self._summary is not None:
+            seconds = datetime.now(tz=timezone.utc).timestamp() - start_s
+            self._summary.write(obs_id, results, seconds, executor.output_size)
+
+    def _report(self, results, start_s):
+        if self._summary is not None:
+            return -1 if any(entry.failure is not None for entry in results) else 0
+        result = 0
+        skipped = 0
+        for entry in results:
+            if entry.skipped:
+                skipped += 1
+            elif entry.failure is None:
+                self._reporter.capture_success(entry.storage_name.obs_id, entry.storage_name.file_name, start_s)
+            else:
+                self._logger.debug(entry.stack)
+                self._reporter.capture_failure(entry.storage_name, entry.failure, entry.stack)
+                result = -1
+        if skipped > 0:
+            self._reporter.add_skipped(skipped)
+        return result
+
+
+class IOEngine:
+    """
+    Runs the blocking client calls from asyncio, in a thread pool, with at most limits[service] calls in flight per
+    service. Calls that fail with an error that is_transient are retried, with exponential backoff, and the service
+    slot is released while waiting. Other errors, like a missing file, fail the same way each time, so they are not
+    retried.
+    """
+
+    def __init__(self, pool, limits, retries=IO_RETRIES, backoff_s=IO_BACKOFF_S):
+        """
+        :param pool: Executor for the blocking calls
+        :param limits: dict of the number of concurrent calls, by service name
+        """
+        self._pool = pool
+        self._semaphores = {service: asyncio.Semaphore(limit) for service, limit in limits.items()}
+        self._retries = retries
+        self._backoff_s = backoff_s
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    async def call(self, service, fn, *args, retry=True):
+        """
+        :param service: str a key of limits
+        :param fn: the blocking call
+        :param retry: bool False for calls that are not safe to repeat
+        :return: the result of fn(*args)
+        """
+        loop = asyncio.get_running_loop()
+        retries = self._retries if retry else 0
+        for attempt in range(retries + 1):
+            try:
+                async with self._semaphores[service]:
+                    return await loop.run_in_executor(self._pool, partial(fn, *args))
+            except Exception as e:
+                if attempt == retries or not is_transient(e):
+                    raise
+                delay = self._backoff_s * 2**attempt
+                self._logger.warning(f'{service} call failed with {e}. Retry in {delay}s.')
+                await asyncio.sleep(delay)
+
+
+class AsyncTileExecutor(TileExecutor):
+    """
+    A TileExecutor that retrieves the file information and headers for all the files of the TILE concurrently,
+    through an IOEngine, then applies the visitors, in order, in a bounded CPU executor.
+    """
+
+    async def execute_async(self, obs_id, storage_names, engine, cpu_pool):
+        """
+        :param obs_id: str the TILE
+        :param storage_names: list of StorageName instances for the TILE, in the order they are to be applied
+        :param engine: IOEngine for the 'data' and 'metadata' services
+        :param cpu_pool: Executor for the visitors
+        :return: list of TileResult, one per StorageName, in the same order
+        """
+        self._logger.debug(f'Begin execute_async for {obs_id} with {len(storage_names)} files.')
+        try:
+            await engine.call('metadata', self._read_observation, obs_id)
+        except Exception as e:
+            stack = traceback.format_exc()
+            return [TileResult(storage_name, e, stack) for storage_name in storage_names]
+
+        prepared = await asyncio.gather(
+            *[self._prepare_async(storage_name, engine) for storage_name in storage_names]
+        )
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(cpu_pool, self._visit_prepared, storage_names, prepared)
+        if _has_changes(results):
+            try:
+                # a repeated create fails, so no retries
+                await engine.call('metadata', self._write_observation, storage_names[0], retry=False)
+            except Exception as e:
+                results = _write_failed(results, e, traceback.format_exc())
+        self._logger.debug(f'End execute_async for {obs_id}.')
+        return results
+
+    async def _prepare_async(self, storage_name, engine):
+        try:
+            skipped = await engine.call('data', self._retrieve, storage_name)
+            return TileResult(storage_name, None, None, True) if skipped else None
+        except Exception as e:
+            return self._failure(storage_name, e)
+
+
+class AsyncTileRunner(TileRunner):
+    """
+    A TileRunner that executes TILEs with asyncio. Storage calls (info, headers) and repository calls (read,
+    create, update) from all the TILEs in flight overlap, limited by config.data_concurrency and
+    config.metadata_concurrency, while at most config.tile_workers TILEs apply their visitors at once. The
+    number of TILEs in flight is limited to config.data_concurrency, which bounds the headers held in memory.
+    """
+
+    def _run_tiles(self, tiles):
+        return asyncio.run(self._run_async(tiles))
+
+    async def _run_async(self, tiles):
+        limits = {'data': self._config.data_concurrency, 'metadata': self._config.metadata_concurrency}
+        self._logger.info(f'Execute {len(tiles)} TILEs asynchronously with {limits}.')
+        in_flight = asyncio.Semaphore(self._config.data_concurrency)
+        result = 0
+        with ThreadPoolExecutor(max_workers=sum(limits.values())) as io_pool, ThreadPoolExecutor(
+            max_workers=max(1, self._config.tile_workers)
+        ) as cpu_pool:
+            engine = IOEngine(io_pool, limits)
+            tasks = [
+                asyncio.create_task(self._run_tile_async(obs_id, tile_storage_names, engine, cpu_pool, in_flight))
+                for obs_id, tile_storage_names in tiles.items()
+            ]
+            for task in asyncio.as_completed(tasks):
+                result |= self._report(*await task)
+        return result
+
+    async def _run_tile_async(self, obs_id, storage_names, engine, cpu_pool, in_flight):
+        async with in_flight:
+            start_s = datetime.now(tz=timezone.utc).timestamp()
+            executor = AsyncTileExecutor(
+                self._clients, self._config, self._meta_visitors, self._reporter, self._mapping_pool
+            )
+            results = await executor.execute_async(obs_id, storage_names, engine, cpu_pool)
+            self._summarize(obs_id, results, start_s, executor)
+            return results, start_s
+
+
+class DryRunSummary:
+    """
+    Appends one JSON line per TILE to a file, with the number of files, the failures by file name, the elapsed
+    seconds, and the size of the Observation XML:
+
+    {"tile": "TILE102070858", "files": 9, "failures": {}, "seconds": 1.234, "xml_bytes": 123456}
+    """
+
+    def __init__(self, fqn):
+        self._fqn = fqn
+        self._lock = Lock()
+
+    def write(self, obs_id, results, seconds, xml_bytes):
+        line = {
+            'tile': obs_id,
+            'files': len(results),
+            'failures': {
+                entry.storage_name.file_name: str(entry.failure) for entry in results if entry.failure is not None
+            },
+            'seconds': round(seconds, 6),
+            'xml_bytes': xml_bytes,
+        }
+        with self._lock:
+            with open(self._fqn, 'a') as f:
+                f.write(f'{json.dumps(line)}\n')
+
+
+class TodoProgress:
+    """
+    Records, in the progress file, the byte offset of the first todo entry that a streaming run has not yet
+    completed, so that a run that stops part-way through a todo file can resume from that entry. An offset
+    recorded for a todo file of a different size is not used.
+    """
+
+    OFFSET_REGEX = re.compile(r'todo (?P<fqn>\S+) size (?P<size>\d+) offset (?P<offset>\d+)$')
+
+    def __init__(self, progress_fqn, work_fqn):
+        self._progress_fqn = progress_fqn
+        self._work_fqn = work_fqn
+        self._size = os.stat(work_fqn).st_size
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def read(self):
+        """
+        :return: int the byte offset from which to resume, 0 if there is nothing to resume
+        """
+        result = 0
+        if os.path.exists(self._progress_fqn):
+            # line at a time, because the progress file is never truncated
+            with open(self._progress_fqn) as f:
+                for line in f:
+                    match = TodoProgress.OFFSET_REGEX.search(line.rstrip())
+                    if match is not None and match.group('fqn') == self._work_fqn:
+                        result = int(match.group('offset')) if int(match.group('size')) == self._size else 0
+        if result > 0:
+            self._logger.info(f'Resume {self._work_fqn} at offset {result}.')
+        return result
+
+    def write(self, offset):
+        """
+        :param offset: int the byte offset of the first entry not completed. 0 records that the todo file was
+            completed, so the next run starts at the beginning.
+        """
+        with open(self._progress_fqn, 'a') as f:
+            f.write(
+                f'{datetime.now(tz=timezone.utc).isoformat()} todo {self._work_fqn} size {self._size} '
+                f'offset {offset}\n'
+            )
+
+
+def stream_todo(work_fqn, storage_name_ctor, window, offset=0):
+    """
+    Reads a todo file lazily, a bounded window of entries at a time.
+
+    A window is closed only at a change of TILE, so a window holds at most 'window' entries, plus the remaining
+    consecutive entries of the TILE of the last of those, and a TILE that is listed contiguously is never
+    executed in two pieces.
+
+    :param work_fqn: str the todo file
+    :param storage_name_ctor: StorageName extension, constructed with a list of source names
+    :param window: int the number of entries after which to close a window
+    :param offset: int the byte offset of the first entry to read
+    :return: generator of (list of StorageName instances, int byte offset of the entry after the window)
+    """
+    batch = []
+    with open(work_fqn, 'rb') as f:
+        f.seek(offset)
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            entry = line.decode().strip()
+            if not entry:
+                continue
+            storage_name = storage_name_ctor([entry])
+            if len(batch) >= window and storage_name.obs_id != batch[-1].obs_id:
+                yield batch, position
+                batch = []
+            batch.append(storage_name)
+        if batch:
+            yield batch, f.tell()
+
+
+def _count_todo(work_fqn, offset):
+    result = 0
+    with open(work_fqn, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if line.strip():
+                result += 1
+    return result
+
+
+def _run_todo_streaming(config, runner, reporter, storage_name_ctor):
+    progress = TodoProgress(config.progress_fqn, config.work_fqn)
+    offset = progress.read()
+    reporter.capture_todo(_count_todo(config.work_fqn, offset), 0, 0)
+    result = 0
+    for storage_names, offset in stream_todo(config.work_fqn, storage_name_ctor, config.todo_window, offset):
+        result |= runner.run(storage_names)
+        progress.write(offset)
+    progress.write(0)
+    return result
+
+
+def _read_todo(config, storage_name_ctor):
+    result = []
+    with open(config.work_fqn) as f:
+        for line in f:
+            entry = line.strip()
+            if entry:
+                result.append(storage_name_ctor([entry]))
+    return result
+
+
+def _list_local_files(config, storage_name_ctor):
+    """
+    The work, when config.use_local_files is set, is the files in the config.data_sources directories that end in
+    one of config.data_source_extensions, as for the caom2pipe local-file data source.
+    """
+    if not config.data_sources:
+        raise mc.CadcException('use_local_files is set, but there are no data_sources directories to list.')
+    extensions = tuple(config.data_source_extensions)
+    result = []
+    for data_source in config.data_sources:
+        if not os.path.isdir(data_source):
+            raise mc.CadcException(f'use_local_files is set, but data_sources entry {data_source} is not a directory.')
+        directories = [data_source]
+        while directories:
+            with os.scandir(directories.pop()) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir():
+                        if config.recurse_data_sources:
+                            directories.append(entry.path)
+                    elif entry.name.endswith(extensions):
+                        result.append(storage_name_ctor([entry.path]))
+    return result
+
+
+def _get_runner(clients, config, meta_visitors, reporter):
+    runner_class = AsyncTileRunner if config.async_io else TileRunner
+    return runner_class(clients, config, meta_visitors, reporter)
+
+
+def _set_up(config):
+    if config.retry_failures:
+        # the caom2pipe runners re-execute the retry file, and the TILE runners do not
+        raise mc.CadcException(
+            f'retry_failures is not supported with tile_batching, daemon or dry_run. Set it to False, and execute '
+            f'the entries of {config.retry_fqn} as a todo file instead.'
+        )
+    logging.getLogger().setLevel(config.logging_level)
+    mc.StorageName.collection = config.collection
+    mc.StorageName.scheme = config.scheme
+    mc.StorageName.preview_scheme = config.preview_scheme
+    mc.StorageName.data_source_extensions = config.data_source_extensions
+    reporter = mc.ExecutionReporter(config, mc.Observable(config))
+    clients = EUCLIDClientCollection(config, reporter.observable.metrics)
+    return reporter, clients
+
+
+def run_by_todo_tile(config, meta_visitors, storage_name_ctor):
+    """
+    Uses a todo file to identify the work to be done, and does that work one TILE at a time. With
+    config.use_local_files, the work is the files in the config.data_sources directories instead.
+
+    With config.todo_window > 0, the todo file is read a window of entries at a time, and the progress through
+    the todo file is recorded after each window, so memory use does not depend on the size of the todo file,
+    and a run that stops part-way through resumes at the first window that did not complete.
+
+    :param config: Config instance, with values already retrieved
+    :param meta_visitors: list of modules with visit methods
+    :param storage_name_ctor: StorageName extension, constructed with a list of source names
+    :return 0 if successful, -1 if there's any sort of failure.
+    """
+    reporter, clients = _set_up(config)
+    runner = _get_runner(clients, config, meta_visitors, reporter)
+    try:
+        if config.use_local_files:
+            storage_names = _list_local_files(config, storage_name_ctor)
+        elif config.todo_window > 0:
+            return _run_todo_streaming(config, runner, reporter, storage_name_ctor)
+        else:
+            storage_names = _read_todo(config, storage_name_ctor)
+        reporter.capture_todo(len(storage_names), 0, 0)
+        return runner.run(storage_names)
+    finally:
+        runner.close()
+
+
+def run_by_state_tile(config, meta_visitors, storage_name_ctor, source, bookmark_name, tile_index=None):
+    """
+    Uses a state file with a timestamp, and a data source, to identify the work to be done, and does that work
+    one TILE at a time.
+
+    The time-boxes run from the bookmark to now. The length of each time-box is source.interval, which the
+    source may change after each time-box. The bookmark is saved, with an atomic replace of the state file,
+    after each time-box.
+
+    With a tile_index, the work of each time-box is added to the index, and only the TILEs the index says are
+    ready are executed, with all of their files, then removed from the index. The files of a TILE that already
+    has an Observation are re-deliveries, so they are not held.
+
+    :param config: Config instance, with values already retrieved
+    :param meta_visitors: list of modules with visit methods
+    :param storage_name_ctor: StorageName extension, constructed with a list of source names
+    :param source: DataSource extension with get_time_box_work and an interval timedelta
+    :param bookmark_name: str the bookmark in the state file
+    :param tile_index: TileIndex, or None to execute the work of each time-box as it is found
+    :return 0 if successful, -1 if there's any sort of failure.
+    """
+    reporter, clients = _set_up(config)
+    runner = _get_runner(clients, config, meta_visitors, reporter)
+    try:
+        return _run_time_boxes(config, runner, reporter, storage_name_ctor, source, bookmark_name, tile_index)
+    finally:
+        runner.close()
+
+
+def run_by_state_tile_daemon(
+    config, meta_visitors, storage_name_ctor, source, bookmark_name, tile_index=None, stop=None
+):
+    """
+    The resident form of run_by_state_tile. The clients and the runner, with their connections and caches, are
+    set up once, and the time-boxes from the bookmark to now are executed every config.poll_interval seconds.
+
+    SIGTERM or SIGINT stops the service after the time-box in progress, and its bookmark, are complete. A poll
+    that fails is logged, and the next poll starts again from the bookmark.
+
+    :param config: Config instance, with values already retrieved
+    :param meta_visitors: list of modules with visit methods
+    :param storage_name_ctor: StorageName extension, constructed with a list of source names
+    :param source: DataSource extension with get_time_box_work and an interval timedelta
+    :param bookmark_name: str the bookmark in the state file
+    :param tile_index: TileIndex, or None to execute the work of each time-box as it is found
+    :param stop: threading.Event that stops the service when set, or None to stop on SIGTERM or SIGINT
+    :return 0 if every poll was successful, -1 if there's any sort of failure.
+    """
+    reporter, clients = _set_up(config)
+    runner = _get_runner(clients, config, meta_visitors, reporter)
+    if stop is None:
+        stop = Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda ignore_signum, ignore_frame: stop.set())
+    logging.info(f'Polling every {config.poll_interval} seconds.')
+    result = 0
+    try:
+        while not stop.is_set():
+            try:
+                result |= _run_time_boxes(
+                    config, runner, reporter, storage_name_ctor, source, bookmark_name, tile_index, stop
+                )
+            except Exception as e:
+                logging.error(f'Poll failed with {e}')
+                logging.debug(traceback.format_exc())
+                result = -1
+            stop.wait(config.poll_interval)
+    finally:
+        runner.close()
+    logging.info('Stopped.')
+    return result
+
+
+def _run_time_boxes(config, runner, reporter, storage_name_ctor, source, bookmark_name, tile_index, stop=None):
+    prev_exec_dt = mc.State(config.state_fqn).get_bookmark(bookmark_name)
+    end_dt = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    result = 0
+    while prev_exec_dt < end_dt and not (stop is not None and stop.is_set()):
+        exec_dt = min(prev_exec_dt + source.interval, end_dt)
+        entry_names = [entry.entry_name for entry in source.get_time_box_work(prev_exec_dt, exec_dt)]
+        ready = {}
+        if tile_index is not None:
+            tile_index.add(entry_names, runner.has_observation)
+            ready = tile_index.ready()
+            entry_names = [entry_name for tile_entry_names in ready.values() for entry_name in tile_entry_names]
+            logging.info(f'{len(ready)} TILEs ready, {len(tile_index) - len(ready)} TILEs held.')
+        reporter.capture_todo(len(entry_names), 0, 0)
+        if len(entry_names) > 0:
+            result |= runner.run([storage_name_ctor([entry_name]) for entry_name in entry_names])
+        if tile_index is not None:
+            tile_index.remove(ready.keys())
+        save_bookmark(config.state_fqn, bookmark_name, exec_dt)
+        prev_exec_dt = exec_dt
+    return result
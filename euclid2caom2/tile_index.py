@@ -0,0 +1,190 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Implements a file-backed index of the products of each TILE that have arrived, so that incremental execution can
+hold a TILE until all of its products are available, and ingest it in one pass.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from os.path import basename
+from tempfile import NamedTemporaryFile
+
+import yaml
+
+
+__all__ = ['TileIndex']
+
+
+class TileIndex:
+    """
+    A versioned YAML index, by TILE, of the most recent file name for each product type, and of when the first
+    product of the TILE arrived. The content looks like:
+
+    version: 1
+    tiles:
+      TILE102070858:
+        first_seen: 2026-10-18T21:50:00.000000+00:00
+        products:
+          BGMOD-VIS: esa:EUCLID/EUC_MER_BGMOD-VIS_TILE102070858-F79595_20241105T125727.727179Z_00.00.fits
+
+    A TILE is ready when it has every one of the expected product types, when its first product arrived more than
+    timeout ago, or when it already had an Observation when its first product arrived, because then the products are
+    a re-delivery, which waiting does not complete. Such a TILE has 'ingested: true'. The file is replaced atomically
+    after each change.
+
+    The mapping module, for the naming rules and the default expected product types, is imported when an index is
+    constructed. oldest reads when the longest-held TILE arrived without it, so an idle incremental run stays cheap.
+    """
+
+    VERSION = 1
+
+    def __init__(self, fqn, timeout=timedelta(hours=24), expected=None):
+        self._fqn = fqn
+        self._timeout = timeout
+        if expected is None:
+            from euclid2caom2.main_app import EUCLID_TILE_PRODUCT_TYPES
+
+            expected = EUCLID_TILE_PRODUCT_TYPES
+        self._expected = expected
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._tiles = _read_tiles(fqn)
+
+    @staticmethod
+    def oldest(fqn):
+        """:return: datetime the first product of the longest-held TILE in the index at fqn arrived, or None"""
+        return min((datetime.fromisoformat(entry['first_seen']) for entry in _read_tiles(fqn).values()), default=None)
+
+    def add(self, entry_names, has_observation=None):
+        """
+        :param entry_names: list of str, the file names or URIs that have arrived. A later arrival of a product
+            type replaces the earlier one.
+        :param has_observation: callable that returns True when the repository has the Observation of a TILE,
+            called once for each TILE that is not already held, or None to hold every incomplete TILE
+        """
+        from euclid2caom2.main_app import EUCLIDName
+
+        now = datetime.now(tz=timezone.utc).isoformat()
+        for entry_name in entry_names:
+            parts = EUCLIDName.parse(basename(entry_name))
+            tile = self._tiles.get(parts.tile)
+            if tile is None:
+                tile = {'first_seen': now, 'products': {}}
+                if has_observation is not None and has_observation(parts.tile):
+                    self._logger.info(f'{parts.tile} is already ingested, so it is not held.')
+                    tile['ingested'] = True
+                self._tiles[parts.tile] = tile
+            tile['products'][parts.product_type] = entry_name
+        self._write()
+
+    def is_complete(self, tile):
+        return self._expected <= self._tiles[tile]['products'].keys()
+
+    def ready(self):
+        """
+        :return: dict of TILE to the list of its file names, for the TILEs that are complete or have timed out
+        """
+        now = datetime.now(tz=timezone.utc)
+        result = {}
+        for tile, entry in self._tiles.items():
+            if self.is_complete(tile) or entry.get('ingested'):
+                result[tile] = list(entry['products'].values())
+            elif now - datetime.fromisoformat(entry['first_seen']) > self._timeout:
+                missing = len(self._expected - entry['products'].keys())
+                self._logger.warning(f'{tile} timed out with {missing} missing products.')
+                result[tile] = list(entry['products'].values())
+        return result
+
+    def remove(self, tiles):
+        """:param tiles: the TILEs that have been ingested"""
+        for tile in tiles:
+            self._tiles.pop(tile, None)
+        self._write()
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def _write(self):
+        with NamedTemporaryFile('w', dir=os.path.dirname(self._fqn) or '.', delete=False) as f:
+            yaml.safe_dump({'version': TileIndex.VERSION, 'tiles': self._tiles}, f)
+        os.replace(f.name, self._fqn)
+
+
+def _read_tiles(fqn):
+    result = {}
+    if os.path.exists(fqn):
+        with open(fqn) as f:
+            content = yaml.safe_load(f)
+        if content and content.get('version') == TileIndex.VERSION:
+            result = content.get('tiles') or {}
+        else:
+            # unlike a cache, the index is the only record of the held files, so it is never silently dropped
+            raise ValueError(f'{fqn} has an unsupported version.')
+    return result
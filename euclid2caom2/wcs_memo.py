@@ -0,0 +1,205 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Re-uses the WCS-derived Chunk metadata across the files of a TILE.
+
+The mosaic products of a TILE and filter (BGSUB mosaic, RMS, FLAG, BGMOD) share one WCS, so the Chunk.position and
+Chunk.energy that FitsWcsParser derives from it are the same for each of them. MemoizedFitsWcsParser keeps those
+results, keyed by a hash of the WCS keywords of the header, and only builds the astropy Wcsprm for a WCS it has not
+seen before.
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from copy import deepcopy
+from hashlib import sha256
+from threading import Lock
+
+from caom2 import Chunk, SpatialWCS, SpectralWCS
+from caom2utils.wcs_parsers import FitsWcsParser
+
+
+__all__ = ['MemoizedFitsWcsParser', 'wcs_key']
+
+
+# the keywords that determine the WCS-derived position and energy - DATE-OBS and MJD-OBS are excluded, because they
+# differ between the products of a TILE, and do not change either result
+WCS_KEYWORD = re.compile(
+    r'^(Z?NAXIS\d*|WCSAXES|CTYPE\d+|CUNIT\d+|CRVAL\d+|CRPIX\d+|CDELT\d+|CROTA\d+|CD\d+_\d+|PC\d+_\d+|PV\d+_\d+|'
+    r'PS\d+_\d+|RADESYS|RADECSYS|EQUINOX|EPOCH|LONPOLE|LATPOLE|RESTFRQ|RESTFREQ|RESTWAV|SPECSYS|SSYSOBS|VELOSYS)$'
+)
+# the number of distinct WCS results kept
+MAX_ENTRIES = 1024
+
+
+def wcs_key(header):
+    """
+    :param header: fits.Header
+    :return: str hash of the WCS cards of the header
+    """
+    # the card images, because a fits.Header value lookup costs more than rendering the whole header
+    text = header.tostring()
+    cards = sorted(
+        text[start:start + 80] for start in range(0, len(text), 80) if WCS_KEYWORD.match(text[start:start + 8].rstrip())
+    )
+    return sha256(''.join(cards).encode()).hexdigest()
+
+
+class _Memo:
+    """A bounded, thread-safe, least-recently-used cache."""
+
+    def __init__(self, max_entries):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class MemoizedFitsWcsParser(FitsWcsParser):
+    """
+    A FitsWcsParser that re-uses the results of augment_position and augment_energy for headers with the same WCS
+    keywords. The Wcsprm is only built when a result is not memoized. Memoized results are copied into each Chunk,
+    because the blueprint values are applied to them afterwards.
+    """
+
+    memo = _Memo(MAX_ENTRIES)
+
+    def __init__(self, header, file, extension):
+        # FitsWcsParser.__init__ builds the Wcsprm, so it is called on the first use of wcs instead
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._wcsprm = None
+        self.header = header
+        self.file = file
+        self.extension = extension
+        self._key = wcs_key(header)
+
+    @property
+    def wcs(self):
+        if self._wcsprm is None:
+            # sets wcs, through the setter, before it uses it
+            super().__init__(self.header, self.file, self.extension)
+        return self._wcsprm
+
+    @wcs.setter
+    def wcs(self, value):
+        self._wcsprm = value
+
+    def augment_position(self, chunk):
+        self._augment('position', chunk, ('position_axis_1', 'position_axis_2', 'position'), super().augment_position)
+
+    def augment_energy(self, chunk):
+        self._augment('energy', chunk, ('energy_axis', 'energy'), super().augment_energy)
+
+    def _augment(self, name, chunk, attributes, augment):
+        key = (name, self._key)
+        values = MemoizedFitsWcsParser.memo.get(key)
+        if values is None:
+            # an empty Chunk, so that only what augment sets is kept, and not what the chunk already had, from an
+            # earlier file or the repository
+            fresh = Chunk()
+            fresh.naxis = chunk.naxis
+            augment(fresh)
+            values = tuple(getattr(fresh, attribute) for attribute in attributes)
+            MemoizedFitsWcsParser.memo.put(key, values)
+            self.logger.debug(f'Computed {name} for {self._key}.')
+        for attribute, value in zip(attributes, values):
+            _apply(chunk, attribute, value)
+
+
+def _apply(chunk, attribute, value):
+    # as FitsWcsParser does - an existing SpatialWCS or SpectralWCS is updated, and keeps the values augment does not
+    # set
+    if value is None:
+        return
+    current = getattr(chunk, attribute)
+    if current is None or not isinstance(value, (SpatialWCS, SpectralWCS)):
+        setattr(chunk, attribute, deepcopy(value))
+        return
+    for name in dir(type(value)):
+        member = getattr(type(value), name)
+        if isinstance(member, property) and member.fset is not None and getattr(value, name) is not None:
+            setattr(current, name, deepcopy(getattr(value, name)))
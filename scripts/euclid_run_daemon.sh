@@ -0,0 +1,18 @@
+#!/bin/bash
+
+COLLECTION="euclid"
+IMAGE="opencadc/${COLLECTION}2caom2"
+
+echo "Get a proxy certificate"
+cp $HOME/.ssl/cadcproxy.pem ./ || exit $?
+
+echo "Get image ${IMAGE}"
+docker pull ${IMAGE}
+
+# config.yml must have 'daemon: True'. docker stop sends SIGTERM, and the service stops after the time-box in
+# progress. The proxy certificate must be refreshed in ${PWD} before it expires.
+echo "Run image ${IMAGE}"
+docker run -d --restart unless-stopped --stop-timeout 600 --name ${COLLECTION}_daemon --user $(id -u):$(id -g) -e HOME=/usr/src/app -v ${PWD}:/usr/src/app/ ${IMAGE} ${COLLECTION}_run_incremental || exit $?
+
+date
+exit 0